@@ -0,0 +1,6 @@
+"""Headless core of the Day Trading Tool.
+
+Everything here works without a display: candle fetching and caching, key levels,
+stop losses, the instrument catalog and the account poller. The Tk GUIs and the
+command line (``python -m daytrading``) are both built on top of it.
+"""
@@ -0,0 +1,5 @@
+from .cli import main
+
+# Guarded so worker processes started by the backtest do not run the command again
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import queue
+import threading
+from .oanda_client import PRACTICE_URL, get_client
+
+
+# Function to fetch account summary (including NAV)
+def fetch_account_summary(api_key, account_id, base_url=PRACTICE_URL):
+    data = get_client(api_key, base_url).get(f"/v3/accounts/{account_id}/summary")
+    return data.get("account", {}).get("balance", "N/A")
+
+
+class AccountPoller:
+    """Keeps the account balance current from a background thread.
+
+    The first poll reads /summary; after that only /changes?sinceTransactionID= is asked
+    for, so each poll downloads just the transactions since the last one. An update is
+    queued only when the balance actually changes; the Tk thread drains `updates`.
+    `currency` holds the account currency once the summary has been read.
+    """
+
+    def __init__(self, get, account_id, interval=15):
+        self.get = get
+        self.account_id = account_id
+        self.interval = interval
+        self.updates = queue.Queue()
+        self._wake = threading.Event()
+        self._last_transaction_id = None
+        self._balance = None
+        self._published = None
+        self.currency = ""
+
+    def start(self):
+        threading.Thread(target=self._run, name="account-poller", daemon=True).start()
+
+    # Function to poll straight away instead of waiting for the interval
+    def refresh_now(self):
+        self._wake.set()
+
+    def _run(self):
+        failing = False
+        while True:
+            try:
+                balance = self._poll()
+                if balance != self._published:
+                    self._published = balance
+                    self.updates.put(("balance", balance))
+                failing = False
+            except Exception as e:
+                # Report a failure once, then start again from the summary
+                if not failing:
+                    self.updates.put(("error", e))
+                    failing = True
+                self._last_transaction_id = None
+
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _poll(self):
+        if self._last_transaction_id is None:
+            data = self.get(f"/v3/accounts/{self.account_id}/summary")
+            self._balance = data["account"]["balance"]
+            self.currency = data["account"].get("currency", "")
+        else:
+            data = self.get(f"/v3/accounts/{self.account_id}/changes",
+                            params={"sinceTransactionID": self._last_transaction_id})
+            for transaction in data.get("changes", {}).get("transactions", []):
+                if "accountBalance" in transaction:
+                    self._balance = transaction["accountBalance"]
+        self._last_transaction_id = data["lastTransactionID"]
+        return self._balance
@@ -0,0 +1,221 @@
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+from .candle_store import CandleStore
+from .candles import fetch_candles
+from .fetch_executor import FetchError, fetch_concurrently
+from .key_levels import trading_dates
+from .stop_loss import calculate_stop_loss_matrix
+
+# Key levels replayed by the backtest, in the same terms as build_key_level_index
+LEVEL_NAMES = [
+    "Close of previous day",
+    "2 days ago High", "2 days ago Low",
+    "3 days ago High", "3 days ago Low",
+    "Previous Week High", "Previous Week Low",
+    "Previous Month High", "Previous Month Low",
+    "Previous Year High", "Previous Year Low",
+]
+
+# Length of a daily session in seconds; bounds the last session, which has no next one to end it
+SESSION_LENGTH = 24 * 60 * 60
+
+# r_multiples holds one R per trade in date order; the other fields summarise it
+BacktestResult = namedtuple(
+    "BacktestResult", "instrument direction trades hit_rate average_r total_r max_drawdown r_multiples"
+)
+
+
+# Function to look up, for every row, the high and low of an earlier period
+def period_extremes(keys, highs, lows, wanted):
+    """keys is each candle's (sorted) period number and wanted the period each row needs.
+
+    Returns (highs, lows) per row, NaN where the wanted period has no candles.
+    """
+    periods, starts = np.unique(keys, return_index=True)
+    period_highs = np.maximum.reduceat(highs, starts)
+    period_lows = np.minimum.reduceat(lows, starts)
+    found = np.clip(np.searchsorted(periods, wanted), 0, len(periods) - 1)
+    present = periods[found] == wanted
+    return np.where(present, period_highs[found], np.nan), np.where(present, period_lows[found], np.nan)
+
+# Function to work out the key levels in force on every daily session at once
+def key_level_matrix(daily):
+    """Returns an array of shape (len(daily), len(LEVEL_NAMES)).
+
+    Row i holds the levels a trader would have seen before session i opened, using only
+    candles before it (the live tool's "previous day" is candle i - 1). Missing levels
+    are NaN.
+    """
+    count = len(daily)
+    levels = np.full((count, len(LEVEL_NAMES)), np.nan)
+    if count < 2:
+        return levels
+    levels[1:, 0] = daily.close[:-1]
+    levels[2:, 1], levels[2:, 2] = daily.high[:-2], daily.low[:-2]
+    levels[3:, 3], levels[3:, 4] = daily.high[:-3], daily.low[:-3]
+
+    dates = trading_dates(daily)
+    days = dates.astype(np.int64)
+    last_days = np.r_[days[0] - 1, days[:-1]]
+    # Weeks start on Monday; the epoch (1970-01-01) was a Thursday
+    week_starts = days - (days + 3) % 7
+    last_week_starts = last_days - (last_days + 3) % 7
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    last_months = np.r_[months[0] - 1, months[:-1]]
+    years = dates.astype("datetime64[Y]").astype(np.int64)
+
+    levels[:, 5], levels[:, 6] = period_extremes(week_starts, daily.high, daily.low, last_week_starts - 7)
+    levels[:, 7], levels[:, 8] = period_extremes(months, daily.high, daily.low, last_months - 1)
+    levels[:, 9], levels[:, 10] = period_extremes(years, daily.high, daily.low, years - 1)
+    levels[0] = np.nan
+    return levels
+
+# Function to lay the intraday candles of each daily session out as one row per session
+def intraday_matrix(daily, intraday):
+    """Returns (highs, lows) of shape (len(daily), most candles in a session), NaN padded.
+
+    Candles before the first session, or SESSION_LENGTH or more after the last one
+    opened, are left out. A session without intraday candles gets the daily candle as
+    its only bar, so the backtest still runs on daily history alone (treating a bar that
+    reaches both the target and the stop as stopped out).
+    """
+    count = len(daily)
+    sessions = np.searchsorted(daily.time, intraday.time, side="right") - 1
+    # Each session ends where the next one starts; candles after the last one belong to no session
+    ends = np.r_[daily.time[1:], daily.time[-1:] + SESSION_LENGTH]
+    inside = sessions >= 0
+    inside[inside] = intraday.time[inside] < ends[sessions[inside]]
+    sessions = sessions[inside]
+    bars = np.bincount(sessions, minlength=count)
+    positions = np.arange(len(sessions)) - np.r_[0, np.cumsum(bars)[:-1]][sessions]
+
+    width = max(int(bars.max()) if count else 0, 1)
+    highs = np.full((count, width), np.nan)
+    lows = np.full((count, width), np.nan)
+    highs[sessions, positions] = intraday.high[inside]
+    lows[sessions, positions] = intraday.low[inside]
+    empty = bars == 0
+    highs[empty, 0] = daily.high[empty]
+    lows[empty, 0] = daily.low[empty]
+    return highs, lows
+
+# Function to find the first bar of each row that is True (np.inf where none is)
+def first_true(hits):
+    return np.where(hits.any(axis=1), hits.argmax(axis=1), np.inf)
+
+# Function to replay one direction of the key-level strategy over every session at once
+def simulate(daily, intraday, direction, stop_percent=0.3, target=1, levels=None, bars=None):
+    """Enters at every session's open and returns (session indices, R multiples, target hit).
+
+    LONG trades buy at the ask and are judged on bid prices against bid-side levels;
+    SHORT trades the other way round, as in the live key levels. The target is the
+    `target`-th nearest key level beyond the entry. The stop is calculate_stop_losses'
+    rule applied to the previous session's low (LONG) or high (SHORT). A trade that
+    reaches neither by the end of the session is closed at the session close.
+
+    levels (key_level_matrix of the exit side) and bars (intraday_matrix of the exit
+    side) can be passed in when simulating many parameters on the same candles.
+    """
+    if not 1 <= target <= len(LEVEL_NAMES):
+        raise ValueError(f"target must be between 1 and {len(LEVEL_NAMES)}, got {target}.")
+    exit_side, entry_side = ("bid", "ask") if direction == "LONG" else ("ask", "bid")
+    exits = daily.side(exit_side)
+    sign = 1.0 if direction == "LONG" else -1.0
+    if levels is None:
+        levels = key_level_matrix(exits)
+    if len(daily) < 2:
+        return np.array([], dtype=int), np.array([]), np.array([], dtype=bool)
+
+    entries = daily.side(entry_side).open
+    swings = np.r_[np.nan, (exits.low if direction == "LONG" else exits.high)[:-1]]
+    stops = calculate_stop_loss_matrix(np.nan_to_num(swings), direction, [stop_percent])[:, 0]
+
+    # The target-th level beyond the entry, found by sorting the distances of each row
+    distances = np.where(sign * (levels - entries[:, None]) > 0, sign * (levels - entries[:, None]), np.inf)
+    nth = np.sort(distances, axis=1)[:, target - 1]
+    targets = entries + sign * nth
+    risks = sign * (entries - stops)
+    valid = np.isfinite(nth) & np.isfinite(swings) & (risks > 0)
+
+    highs, lows = bars if bars is not None else intraday_matrix(exits, intraday.side(exit_side))
+    if direction == "LONG":
+        first_target = first_true(highs >= targets[:, None])
+        first_stop = first_true(lows <= stops[:, None])
+    else:
+        first_target = first_true(lows <= targets[:, None])
+        first_stop = first_true(highs >= stops[:, None])
+
+    target_hit = first_target < first_stop
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_multiples = np.where(
+            target_hit, nth / risks,
+            np.where(np.isfinite(first_stop), -1.0, sign * (exits.close - entries) / risks),
+        )
+    sessions = np.flatnonzero(valid)
+    return sessions, r_multiples[sessions], target_hit[sessions]
+
+# Function to summarise R multiples as hit rate, average and total R and max drawdown
+def summarize(instrument, direction, r_multiples, target_hits):
+    trades = len(r_multiples)
+    equity = np.cumsum(r_multiples)
+    peaks = np.maximum.accumulate(np.r_[0.0, equity])[1:]
+    return BacktestResult(
+        instrument, direction, trades,
+        float(target_hits / trades) if trades else 0.0,
+        float(r_multiples.mean()) if trades else 0.0,
+        float(equity[-1]) if trades else 0.0,
+        float((peaks - equity).max()) if trades else 0.0,
+        r_multiples,
+    )
+
+# Function to load cached candles of one instrument for a backtest, without touching the network
+def load_history(store, instrument, start_date, end_date, granularity):
+    # Previous-year levels need the whole year before start_date
+    history_start = datetime(start_date.year - 1, 1, 1, tzinfo=timezone.utc)
+    daily = store.load(instrument, history_start, end_date, "D")
+    intraday = store.load(instrument, start_date, end_date, granularity) if granularity != "D" else daily[:0]
+    return daily, intraday
+
+# Function to backtest one instrument from the candle store (runs in a worker process)
+def backtest_instrument(instrument, start_date, end_date, directions=("LONG", "SHORT"), stop_percent=0.3,
+                        target=1, granularity="H1", db_path="candles.db"):
+    daily, intraday = load_history(CandleStore(db_path), instrument, start_date, end_date, granularity)
+    results = []
+    for direction in directions:
+        sessions, r_multiples, target_hit = simulate(daily, intraday, direction, stop_percent, target)
+        in_range = daily.time[sessions] >= start_date.timestamp()
+        results.append(summarize(instrument, direction, r_multiples[in_range], np.count_nonzero(target_hit[in_range])))
+    return results
+
+# Function to backtest a watchlist, one instrument per worker process
+def run_backtest(instruments, start_date, end_date, directions=("LONG", "SHORT"), stop_percent=0.3, target=1,
+                 granularity="H1", db_path="candles.db", max_workers=None):
+    """Replays cached candles only; sync the history first (see sync_history) to backtest
+    more than what the tool has already fetched. Returns a list of BacktestResult."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(backtest_instrument, instrument, start_date, end_date, directions, stop_percent,
+                        target, granularity, db_path)
+            for instrument in instruments
+        ]
+        return [result for future in futures for result in future.result()]
+
+# Function to download the history a backtest needs into the candle store
+def sync_history(api_key, account_id, instruments, start_date, end_date, base_url, granularity="H1"):
+    """Only what the store does not hold yet is fetched. Returns {instrument: error}."""
+    history_start = datetime(start_date.year - 1, 1, 1, tzinfo=timezone.utc)
+    requests_by_name = {}
+    for instrument in instruments:
+        requests_by_name[(instrument, "D")] = (fetch_candles, (api_key, account_id, instrument, history_start,
+                                                               end_date, base_url, "D"))
+        if granularity != "D":
+            requests_by_name[(instrument, granularity)] = (fetch_candles, (api_key, account_id, instrument, start_date,
+                                                                           end_date, base_url, granularity))
+    try:
+        fetch_concurrently(threading.Event(), requests_by_name)
+    except FetchError as e:
+        return {instrument: error for (instrument, _), error in e.errors.items()}
+    return {}
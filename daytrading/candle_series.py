@@ -0,0 +1,107 @@
+import numpy as np
+
+# Price columns of a series, in the order OANDA's o/h/l/c fields map onto them
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+# Price sides OANDA quotes candles on; the plain open/high/low/close columns are mid
+SIDES = ("mid", "bid", "ask")
+
+
+# Function to turn values into a float column, or reuse the fallback column when there are none
+def _column(values, fallback):
+    return fallback if values is None else np.asarray(values, dtype=float)
+
+
+class CandleSeries:
+    """Candles of one instrument held as parallel NumPy columns, oldest first.
+
+    time is in seconds since the epoch (UTC) and complete marks candles that have
+    closed. open/high/low/close are mid prices; bid_* and ask_* hold the same candles on
+    the bid and ask side, falling back to mid when no quotes for a side were given.
+    Slices and masks return new series over the same columns, so every metric derived
+    from a fetch works on the one parsed copy instead of re-parsing the JSON.
+    """
+
+    def __init__(self, time, open, high, low, close, volume, complete,
+                 bid_open=None, bid_high=None, bid_low=None, bid_close=None,
+                 ask_open=None, ask_high=None, ask_low=None, ask_close=None):
+        self.time = np.asarray(time, dtype=float)
+        self.open = np.asarray(open, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.low = np.asarray(low, dtype=float)
+        self.close = np.asarray(close, dtype=float)
+        self.volume = np.asarray(volume, dtype=float)
+        self.complete = np.asarray(complete, dtype=bool)
+        self.bid_open = _column(bid_open, self.open)
+        self.bid_high = _column(bid_high, self.high)
+        self.bid_low = _column(bid_low, self.low)
+        self.bid_close = _column(bid_close, self.close)
+        self.ask_open = _column(ask_open, self.open)
+        self.ask_high = _column(ask_high, self.high)
+        self.ask_low = _column(ask_low, self.low)
+        self.ask_close = _column(ask_close, self.close)
+
+    @classmethod
+    def empty(cls):
+        return cls(*([[]] * 7))
+
+    # Function to parse OANDA candles (requested with price=MBA, datetimeFormat=UNIX) in one pass
+    @classmethod
+    def from_oanda(cls, candles):
+        count = len(candles)
+        prices = np.empty((count, len(SIDES), len(PRICE_COLUMNS)))
+        for row, candle in enumerate(candles):
+            mid = candle["mid"]
+            for side_index, side in enumerate(SIDES):
+                # A side missing from the response is read as mid
+                quote = candle.get(side, mid)
+                prices[row, side_index] = (quote["o"], quote["h"], quote["l"], quote["c"])
+        return cls(
+            np.fromiter((candle["time"] for candle in candles), dtype=float, count=count),
+            *prices[:, 0].T,
+            np.fromiter((candle.get("volume", 0) for candle in candles), dtype=float, count=count),
+            np.fromiter((candle["complete"] for candle in candles), dtype=bool, count=count),
+            *prices[:, 1].T,
+            *prices[:, 2].T,
+        )
+
+    # Function to merge several series into one sorted by time; later series win on a tie
+    @classmethod
+    def concat(cls, parts):
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        merged = cls(*(np.concatenate([getattr(part, name) for part in parts]) for name in cls.columns()))
+        # Reversed so np.unique keeps the last occurrence of each time
+        _, last = np.unique(merged.time[::-1], return_index=True)
+        return merged[len(merged) - 1 - last]
+
+    @staticmethod
+    def columns():
+        return (("time",) + PRICE_COLUMNS + ("volume", "complete")
+                + tuple(f"{side}_{column}" for side in SIDES[1:] for column in PRICE_COLUMNS))
+
+    def __len__(self):
+        return len(self.time)
+
+    # Function to take a slice, index array or boolean mask of the candles
+    def __getitem__(self, index):
+        return CandleSeries(*(getattr(self, name)[index] for name in self.columns()))
+
+    # Function to get the candles whose time falls within [start_date, end_date]
+    def between(self, start_date, end_date):
+        start = np.searchsorted(self.time, start_date.timestamp(), side="left")
+        end = np.searchsorted(self.time, end_date.timestamp(), side="right")
+        return self[start:end]
+
+    def closed(self):
+        return self[self.complete]
+
+    # Function to view one side ("mid", "bid" or "ask") as the open/high/low/close columns
+    def side(self, side):
+        if side == "mid":
+            return self
+        prices = [getattr(self, f"{side}_{column}") for column in PRICE_COLUMNS]
+        return CandleSeries(self.time, *prices, self.volume, self.complete, *prices, *prices)
@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from .candle_series import CandleSeries
+
+# Stored columns, in CandleSeries order; complete is implied since only closed candles are kept
+CANDLE_COLUMNS = ("time", "open", "high", "low", "close", "volume",
+                  "bid_open", "bid_high", "bid_low", "bid_close", "ask_open", "ask_high", "ask_low", "ask_close")
+
+
+class CandleStore:
+    """SQLite store of closed candles, keyed by instrument, granularity and candle time.
+
+    Besides the candles it records which time ranges have been synced in full, so a
+    range that is already on disk is served without touching the network and only
+    the missing gaps of a partly synced range are fetched; for a range ending now that
+    is just the delta since the last sync. The candles of each (instrument, granularity)
+    are read from disk once and then kept in memory as a CandleSeries.
+    """
+
+    def __init__(self, path="candles.db"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._series = {}
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(candles)")]
+            if columns and "ask_close" not in columns:
+                # Stores from before granularities, volume and bid/ask prices were kept are rebuilt from OANDA
+                conn.execute("DROP TABLE candles")
+                conn.execute("DROP TABLE IF EXISTS synced")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS candles ("
+                "instrument TEXT, granularity TEXT, time REAL, open REAL, high REAL, low REAL, close REAL, "
+                "volume REAL, bid_open REAL, bid_high REAL, bid_low REAL, bid_close REAL, "
+                "ask_open REAL, ask_high REAL, ask_low REAL, ask_close REAL, "
+                "PRIMARY KEY (instrument, granularity, time))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS synced (instrument TEXT, granularity TEXT, start REAL, end REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    # Function to get every stored candle of an instrument, reading the disk only the first time
+    def _stored(self, instrument, granularity):
+        with self._lock:
+            series = self._series.get((instrument, granularity))
+            if series is None:
+                with self._connect() as conn:
+                    rows = conn.execute(
+                        f"SELECT {', '.join(CANDLE_COLUMNS)} FROM candles "
+                        "WHERE instrument = ? AND granularity = ? ORDER BY time",
+                        (instrument, granularity),
+                    ).fetchall()
+                columns = list(zip(*rows)) if rows else [[]] * len(CANDLE_COLUMNS)
+                series = self._series[(instrument, granularity)] = CandleSeries(
+                    *columns[:6], [True] * len(rows), *columns[6:])
+            return series
+
+    # Function to read stored candles for a range
+    def load(self, instrument, start_date, end_date, granularity="D"):
+        return self._stored(instrument, granularity).between(start_date, end_date)
+
+    # Function to save closed candles and mark the range they cover as synced
+    def save(self, instrument, candles, start_date, end_date, granularity="D"):
+        closed = candles.closed()
+        # Anything from the first open candle onwards can still change, so it stays unsynced
+        still_open = candles.time[~candles.complete]
+        synced_end = min(end_date, datetime.now(timezone.utc))
+        if len(still_open):
+            synced_end = min(synced_end, datetime.fromtimestamp(still_open.min(), timezone.utc))
+
+        with self._lock:
+            # Read what is stored before writing; a second connection can't read mid-transaction
+            stored = self._stored(instrument, granularity)
+            with self._connect() as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO candles (instrument, granularity, {', '.join(CANDLE_COLUMNS)}) "
+                    f"VALUES ({', '.join(['?'] * (len(CANDLE_COLUMNS) + 2))})",
+                    zip([instrument] * len(closed), [granularity] * len(closed),
+                        *(getattr(closed, name).tolist() for name in CANDLE_COLUMNS)),
+                )
+                if synced_end > start_date:
+                    self._mark_synced(conn, instrument, granularity, start_date.timestamp(), synced_end.timestamp())
+            self._series[(instrument, granularity)] = CandleSeries.concat([stored, closed])
+
+    def _mark_synced(self, conn, instrument, granularity, start, end):
+        # Merge with every synced range that overlaps or touches the new one
+        overlapping = conn.execute(
+            "SELECT start, end FROM synced WHERE instrument = ? AND granularity = ? AND start <= ? AND end >= ?",
+            (instrument, granularity, end, start),
+        ).fetchall()
+        for range_start, range_end in overlapping:
+            start, end = min(start, range_start), max(end, range_end)
+        conn.execute("DELETE FROM synced WHERE instrument = ? AND granularity = ? AND start >= ? AND end <= ?",
+                     (instrument, granularity, start, end))
+        conn.execute("INSERT INTO synced VALUES (?, ?, ?, ?)", (instrument, granularity, start, end))
+
+    # Function to list the parts of a range that still have to be fetched
+    def missing_ranges(self, instrument, start_date, end_date, granularity="D"):
+        with self._connect() as conn:
+            synced = conn.execute(
+                "SELECT start, end FROM synced WHERE instrument = ? AND granularity = ? AND start <= ? AND end >= ? "
+                "ORDER BY start",
+                (instrument, granularity, end_date.timestamp(), start_date.timestamp()),
+            ).fetchall()
+
+        gaps = []
+        cursor = start_date.timestamp()
+        for range_start, range_end in synced:
+            if range_start > cursor:
+                gaps.append((cursor, range_start))
+            cursor = max(cursor, range_end)
+        if cursor < end_date.timestamp():
+            gaps.append((cursor, end_date.timestamp()))
+        return [(datetime.fromtimestamp(s, timezone.utc), datetime.fromtimestamp(e, timezone.utc)) for s, e in gaps]
+
+    # Function to get candles for a range, fetching only what is not stored yet
+    def get_candles(self, instrument, start_date, end_date, fetch, granularity="D"):
+        """fetch(start_date, end_date) must return a CandleSeries of that range from the network.
+
+        Returns the stored closed candles plus any still-open candles from this fetch.
+        """
+        still_open = []
+        for gap_start, gap_end in self.missing_ranges(instrument, start_date, end_date, granularity):
+            candles = fetch(gap_start, gap_end)
+            self.save(instrument, candles, gap_start, gap_end, granularity)
+            still_open.append(candles[~candles.complete].between(start_date, end_date))
+
+        return CandleSeries.concat([self.load(instrument, start_date, end_date, granularity)] + still_open)
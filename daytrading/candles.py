@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime, timezone
+from .candle_series import CandleSeries
+from .candle_store import CandleStore
+from .oanda_client import LIVE_URL, PRACTICE_URL, get_client
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# Function to get the shared candle store for a database file
+def get_store(path="candles.db"):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CandleStore(path)
+        return store
+
+# Function to get the candle database for an API host; demo and live quote the same prices and share one
+def store_path(base_url):
+    return "candles.db" if base_url in (PRACTICE_URL, LIVE_URL) else "candles_mock.db"
+
+# Most candles OANDA returns for one request
+MAX_CANDLES = 5000
+
+
+# Function to request every candle of a granularity in a range from OANDA
+def request_candles(api_key, account_id, instrument, start_date, end_date, base_url=PRACTICE_URL, granularity="D"):
+    """Pages forward from start_date with from= and count=, so syncing a range that ends
+    now downloads only the candles since start_date, in as few requests as possible."""
+    client = get_client(api_key, base_url)
+    params = {
+        "price": "MBA",  # Mid, bid and ask in the one request
+        "from": start_date.isoformat(),
+        "count": MAX_CANDLES,
+        "granularity": granularity,
+        "datetimeFormat": "UNIX",
+    }
+
+    pages = []
+    while True:
+        data = client.get(f"/v3/instruments/{instrument}/candles", params=params)
+        page = CandleSeries.from_oanda(data["candles"])
+        pages.append(page)
+        if len(page) < MAX_CANDLES or page.time[-1] >= end_date.timestamp():
+            break
+        last = datetime.fromtimestamp(page.time[-1], timezone.utc)
+        params = dict(params, **{"from": last.isoformat(), "includeFirst": "false"})
+    return CandleSeries.concat(pages).between(start_date, end_date)
+
+# Function to fetch every candle of a granularity in a range, serving closed candles from the local store
+def fetch_candles(api_key, account_id, instrument, start_date, end_date, base_url=PRACTICE_URL, granularity="D"):
+    candles = get_store(store_path(base_url)).get_candles(
+        instrument, start_date, end_date,
+        lambda start, end: request_candles(api_key, account_id, instrument, start, end, base_url, granularity),
+        granularity,
+    )
+    if not len(candles):
+        raise Exception(f"No {granularity} data returned for the period {start_date.date()} to {end_date.date()}.")
+    return candles
+
+# Function to fetch every daily candle in a range
+def fetch_daily_candles(api_key, account_id, instrument, start_date, end_date, base_url=PRACTICE_URL):
+    return fetch_candles(api_key, account_id, instrument, start_date, end_date, base_url, "D")
+
+# Function to fetch candle data
+def fetch_candle_data(api_key, account_id, instrument, start_date, end_date, base_url=PRACTICE_URL):
+    candles = fetch_daily_candles(api_key, account_id, instrument, start_date, end_date, base_url)
+    return float(candles.high.max()), float(candles.low.min()), float(candles.close[-1])
@@ -0,0 +1,226 @@
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from .account_poller import fetch_account_summary
+from .config import read_base_url, read_config, read_environment
+from .backtest import LEVEL_NAMES, run_backtest, sync_history
+from .candles import store_path
+from .sweep import DIRECTION_FILTERS, rank_combinations, run_sweep, save_sweep
+from .fetch_executor import FetchError, fetch_concurrently
+from .intraday_levels import fetch_intraday_levels
+from .instrument_catalog import InstrumentCatalog, fetch_account_instruments, format_forex_pair, read_favorites
+from .key_levels import fetch_key_level_index, format_key_levels, previous_trading_days
+from .oanda_client import ENVIRONMENTS, get_client
+from .position_size import ConversionRates, calculate_position_sizes
+from .scanner import SCAN_COLUMNS, scan_instruments, scan_row
+from .stop_loss import DEFAULT_PERCENTAGES, calculate_stop_loss_matrix
+
+# Accounts shown side by side by the compare command
+COMPARED_ENVIRONMENTS = ["demo", "live"]
+
+# Take-profit targets a backtest can aim for: the Nth nearest of the key levels
+TARGETS = range(1, len(LEVEL_NAMES) + 1)
+
+
+def levels_command(args, api_key, account_id, base_url):
+    instrument = format_forex_pair(args.instrument)
+    utc_now, day_dates = previous_trading_days()
+    index = fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, base_url)
+    if args.intraday:
+        index = index.with_levels(*fetch_intraday_levels(threading.Event(), api_key, account_id, instrument, base_url))
+    print(format_key_levels(index, args.direction, args.entry, args.two_to_one))
+
+def stops_command(args, api_key, account_id, base_url):
+    stop_losses = calculate_stop_loss_matrix(args.swing_prices, args.direction, args.percentages)
+    print("\t".join(["Swing"] + [f"{percentage:g}%" for percentage in args.percentages]))
+    for swing_price, row in zip(args.swing_prices, stop_losses):
+        print("\t".join([f"{swing_price:g}"] + [f"{value:.6f}" for value in row]))
+
+def scan_command(args, api_key, account_id, base_url):
+    instruments = [format_forex_pair(i) for i in args.instruments] or read_favorites(args.favorites)
+    utc_now, day_dates = previous_trading_days()
+    indexes, errors = scan_instruments(
+        threading.Event(), instruments,
+        lambda instrument: fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, base_url),
+    )
+    print("\t".join(SCAN_COLUMNS))
+    for instrument in sorted(indexes):
+        print("\t".join(str(value) for value in scan_row(indexes[instrument])))
+    for instrument, error in sorted(errors.items()):
+        print(f"{instrument}: {error}", file=sys.stderr)
+
+def nav_command(args, api_key, account_id, base_url):
+    print(fetch_account_summary(api_key, account_id, base_url))
+
+# Function to parse an INSTRUMENT:ENTRY:STOP argument
+def parse_trade(text):
+    try:
+        instrument, entry, stop = text.split(":")
+        return format_forex_pair(instrument), float(entry), float(stop)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INSTRUMENT:ENTRY:STOP, got {text!r}")
+
+def size_command(args, api_key, account_id, base_url):
+    nav = fetch_account_summary(api_key, account_id, base_url)
+    catalog = InstrumentCatalog(lambda: fetch_account_instruments(api_key, account_id, base_url),
+                                path=f"instruments_{account_id}.json")
+    rates = ConversionRates(get_client(api_key, base_url).get, account_id)
+    sizes = calculate_position_sizes(nav, args.risk, args.trades, rates, catalog.pip_location, catalog.unit_precision)
+    currency = rates.home_currency()
+    print("\t".join(["Instrument", "Units", "Stop pips", f"Pip value ({currency})", f"Risk ({currency})"]))
+    for size in sizes:
+        print(f"{size.instrument}\t{size.units}\t{size.stop_pips:.1f}\t{size.pip_value:.2f}\t{size.risk_amount:.2f}")
+
+# Function to parse a YYYY-MM-DD date as midnight UTC
+def parse_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+def backtest_command(args, api_key, account_id, base_url):
+    instruments = [format_forex_pair(i) for i in args.instruments] or read_favorites(args.favorites)
+    if args.sync:
+        errors = sync_history(api_key, account_id, instruments, args.start, args.end, base_url, args.granularity)
+        for instrument, error in sorted(errors.items()):
+            print(f"{instrument}: {error}", file=sys.stderr)
+
+    started = time.perf_counter()
+    results = run_backtest(instruments, args.start, args.end, args.directions, args.stop, args.target,
+                           args.granularity, store_path(base_url), args.workers)
+    print("\t".join(["Instrument", "Direction", "Trades", "Hit %", "Avg R", "Total R", "Max DD (R)"]))
+    for result in results:
+        print(f"{result.instrument}\t{result.direction}\t{result.trades}\t{result.hit_rate * 100:.1f}\t"
+              f"{result.average_r:.3f}\t{result.total_r:.2f}\t{result.max_drawdown:.2f}")
+    print(f"Backtested {len(instruments)} instruments in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+def sweep_command(args, api_key, account_id, base_url):
+    instruments = [format_forex_pair(i) for i in args.instruments] or read_favorites(args.favorites)
+    if args.sync:
+        errors = sync_history(api_key, account_id, instruments, args.start, args.end, base_url, args.granularity)
+        for instrument, error in sorted(errors.items()):
+            print(f"{instrument}: {error}", file=sys.stderr)
+
+    started = time.perf_counter()
+    results = run_sweep(instruments, args.start, args.end, args.stops, args.targets, args.filters, args.directions,
+                        args.granularity, store_path(base_url), args.workers)
+    save_sweep(results, args.output)
+    print(f"Swept {len(results['trades'])} combinations in {time.perf_counter() - started:.1f}s, "
+          f"saved to {args.output}", file=sys.stderr)
+
+    print("\t".join(["Direction", "Filter", "Stop %", "Target", "Trades", "Total R"]))
+    for direction, direction_filter, stop_percent, target, trades, total_r in rank_combinations(results, args.top):
+        print(f"{direction}\t{direction_filter}\t{stop_percent:g}\t{target}\t{trades}\t{total_r:.2f}")
+
+# Function to fetch one environment's NAV and key levels, timing the round trip
+def fetch_environment_levels(config_file, environment, instrument, utc_now, day_dates):
+    api_key, account_id = read_config(config_file, environment)
+    base_url = read_base_url(config_file, environment)
+    started = time.perf_counter()
+    nav = fetch_account_summary(api_key, account_id, base_url)
+    index = fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, base_url)
+    return nav, index, time.perf_counter() - started
+
+def compare_command(args, api_key, account_id, base_url):
+    # Both accounts run side by side; they share the HTTP pools and the candle cache
+    instrument = format_forex_pair(args.instrument)
+    utc_now, day_dates = previous_trading_days()
+    try:
+        results = fetch_concurrently(threading.Event(), {
+            environment: (fetch_environment_levels, (args.config, environment, instrument, utc_now, day_dates))
+            for environment in COMPARED_ENVIRONMENTS
+        })
+        errors = {}
+    except FetchError as e:
+        results, errors = {}, e.errors
+    for environment in COMPARED_ENVIRONMENTS:
+        if environment in errors:
+            print(f"{environment}: {errors[environment]}", file=sys.stderr)
+            continue
+        nav, index, elapsed = results[environment]
+        print(f"== {environment} (NAV {nav}, {elapsed * 1000:.0f} ms) ==")
+        print(format_key_levels(index, args.direction, args.entry))
+
+def gui_command(args, api_key, account_id, base_url):
+    # Tk is only imported when a window is actually wanted
+    from .gui import main
+    main(args.env, args.config)
+
+# Function to parse the command line and run the chosen command
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m daytrading", description="Day Trading Tool without the GUI.")
+    parser.add_argument("--config", default="config.ini", help="configuration file with the OANDA credentials")
+    parser.add_argument("--env", choices=sorted(ENVIRONMENTS), help="account to use, or mock for the local mock server (default: environment in the config, else demo)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    levels = commands.add_parser("levels", help="show take-profit key levels for an entry")
+    levels.add_argument("instrument")
+    levels.add_argument("--direction", choices=["LONG", "SHORT"], default="LONG", type=str.upper)
+    levels.add_argument("--entry", type=float, required=True)
+    levels.add_argument("--two-to-one", type=float)
+    levels.add_argument("--intraday", action="store_true", help="add H4/H1 swing and session high/low levels")
+    levels.set_defaults(run=levels_command)
+
+    stops = commands.add_parser("stops", help="calculate stop losses from one or more swing highs/lows")
+    stops.add_argument("swing_prices", nargs="+", type=float)
+    stops.add_argument("--percentages", nargs="+", type=float, default=list(DEFAULT_PERCENTAGES))
+    stops.add_argument("--direction", choices=["LONG", "SHORT"], default="LONG", type=str.upper)
+    stops.set_defaults(run=stops_command)
+
+    scan = commands.add_parser("scan", help="scan key levels for several instruments (default: favorites)")
+    scan.add_argument("instruments", nargs="*")
+    scan.add_argument("--favorites", default="favorites.txt")
+    scan.set_defaults(run=scan_command)
+
+    nav = commands.add_parser("nav", help="print the account NAV")
+    nav.set_defaults(run=nav_command)
+
+    size = commands.add_parser("size", help="calculate position sizes from the NAV, a risk % and entry/stop prices")
+    size.add_argument("trades", nargs="+", type=parse_trade, metavar="INSTRUMENT:ENTRY:STOP")
+    size.add_argument("--risk", type=float, default=1, help="percentage of the NAV to risk per trade")
+    size.set_defaults(run=size_command)
+
+    backtest = commands.add_parser("backtest", help="replay cached candles through the key-level strategy")
+    backtest.add_argument("instruments", nargs="*")
+    backtest.add_argument("--favorites", default="favorites.txt")
+    backtest.add_argument("--start", type=parse_date, default=parse_date(f"{datetime.now().year - 2}-01-01"),
+                          help="first session to trade, YYYY-MM-DD")
+    backtest.add_argument("--end", type=parse_date, default=datetime.now(timezone.utc), help="last session, YYYY-MM-DD")
+    backtest.add_argument("--directions", nargs="+", choices=["LONG", "SHORT"], default=["LONG", "SHORT"], type=str.upper)
+    backtest.add_argument("--stop", type=float, default=0.3, help="stop-loss percentage beyond the previous swing")
+    backtest.add_argument("--target", type=int, default=1, choices=TARGETS, metavar="N",
+                          help=f"take profit at the Nth nearest key level (1-{len(LEVEL_NAMES)})")
+    backtest.add_argument("--granularity", default="H1", help="intraday candles that decide whether target or stop came first")
+    backtest.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    backtest.add_argument("--sync", action="store_true", help="download missing history before replaying")
+    backtest.set_defaults(run=backtest_command)
+
+    sweep = commands.add_parser("sweep", help="backtest a grid of stop percentages, targets and direction filters")
+    sweep.add_argument("instruments", nargs="*")
+    sweep.add_argument("--favorites", default="favorites.txt")
+    sweep.add_argument("--start", type=parse_date, default=parse_date(f"{datetime.now().year - 2}-01-01"))
+    sweep.add_argument("--end", type=parse_date, default=datetime.now(timezone.utc))
+    sweep.add_argument("--stops", nargs="+", type=float, default=[0.03, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 3])
+    sweep.add_argument("--targets", nargs="+", type=int, default=[1, 2, 3], choices=TARGETS, metavar="N")
+    sweep.add_argument("--filters", nargs="+", choices=DIRECTION_FILTERS, default=DIRECTION_FILTERS)
+    sweep.add_argument("--directions", nargs="+", choices=["LONG", "SHORT"], default=["LONG", "SHORT"], type=str.upper)
+    sweep.add_argument("--granularity", default="H1")
+    sweep.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    sweep.add_argument("--sync", action="store_true", help="download missing history before sweeping")
+    sweep.add_argument("--output", default="sweep.npz", help="columnar results file (NumPy .npz)")
+    sweep.add_argument("--top", type=int, default=10, help="best combinations to print")
+    sweep.set_defaults(run=sweep_command)
+
+    compare = commands.add_parser("compare", help="show NAV and key levels for the demo and live accounts side by side")
+    compare.add_argument("instrument")
+    compare.add_argument("--direction", choices=["LONG", "SHORT"], default="LONG", type=str.upper)
+    compare.add_argument("--entry", type=float, required=True)
+    compare.set_defaults(run=compare_command)
+
+    gui = commands.add_parser("gui", help="open the Tk GUI")
+    gui.set_defaults(run=gui_command)
+
+    args = parser.parse_args(argv)
+    args.env = args.env or read_environment(args.config)
+    # stops needs no account; compare and gui read the credentials themselves
+    api_key, account_id = read_config(args.config, args.env) if args.command in ("levels", "scan", "nav", "size", "backtest", "sweep") else (None, None)
+    args.run(args, api_key, account_id, read_base_url(args.config, args.env))
@@ -0,0 +1,40 @@
+import configparser
+from .oanda_client import ENVIRONMENTS
+
+
+# Function to read configuration file
+def read_config(config_file='config.ini', environment=None):
+    """Returns (api_key, account_id); an [oanda.<environment>] section overrides [oanda]."""
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    section = f'oanda.{environment}'
+    api_key = config.get(section, 'api_key', fallback=config.get('oanda', 'api_key', fallback=None))
+    account_id = config.get(section, 'account_id', fallback=config.get('oanda', 'account_id', fallback=None))
+    if not api_key or not account_id:
+        raise Exception(f"Set api_key and account_id in [{section}] or [oanda] of {config_file}.")
+    return api_key, account_id
+
+# Function to check that an environment is one the tool knows
+def check_environment(environment):
+    if environment not in ENVIRONMENTS:
+        raise Exception(f"Unknown environment '{environment}'; use one of {', '.join(ENVIRONMENTS)}.")
+    return environment
+
+# Function to read which account ("demo", "live" or "mock") to use when none is chosen
+def read_environment(config_file='config.ini'):
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    return check_environment(config.get('oanda', 'environment', fallback='demo'))
+
+# Function to read the API URL of an environment; a url in [oanda.<environment>] overrides the default
+def read_base_url(config_file='config.ini', environment='demo'):
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    check_environment(environment)
+    return config.get(f'oanda.{environment}', 'url', fallback=ENVIRONMENTS[environment])
+
+# Function to read how often the NAV refreshes, in seconds
+def read_nav_refresh_seconds(config_file='config.ini'):
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    return config.getfloat('oanda', 'nav_refresh_seconds', fallback=15)
@@ -0,0 +1,113 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Shared pool for the HTTP requests that make up a single fetch
+request_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fetch-request")
+
+
+class FetchCancelled(Exception):
+    """Raised inside a fetch job once a newer fetch has replaced it."""
+
+
+class FetchError(Exception):
+    """Raised when one or more requests of a concurrent fetch failed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("\n".join(f"{name}: {error}" for name, error in errors.items()))
+
+
+# Function to run several requests at once and collect every failure
+def fetch_concurrently(cancelled, requests_by_name):
+    """Runs each (function, args) in requests_by_name on the request pool.
+
+    Returns a dict of results keyed like requests_by_name. Raises FetchError naming
+    every request that failed, or FetchCancelled if cancelled is set while waiting.
+    """
+    futures = {request_pool.submit(function, *args): name for name, (function, args) in requests_by_name.items()}
+    pending = set(futures)
+    while pending:
+        if cancelled.is_set():
+            for future in pending:
+                future.cancel()
+            raise FetchCancelled()
+        _, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+
+    results, errors = {}, {}
+    for future, name in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = e
+    if errors:
+        raise FetchError(errors)
+    return results
+
+
+class FetchExecutor:
+    """Runs blocking fetch jobs on a worker thread and posts the results to a queue.
+
+    Only the latest job is live. Submitting a new job cancels the one in flight, and
+    results from cancelled jobs are dropped. The Tk thread drains the queue with poll().
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._lock = threading.Lock()
+        self._job_id = 0
+        self._cancel_event = None
+
+    # Function to start a job, cancelling the one in flight
+    def submit(self, job, *args):
+        with self._lock:
+            if self._cancel_event is not None:
+                self._cancel_event.set()
+            self._job_id += 1
+            job_id = self._job_id
+            cancel_event = threading.Event()
+            self._cancel_event = cancel_event
+
+        worker = threading.Thread(target=self._run, args=(job_id, cancel_event, job, args), daemon=True)
+        worker.start()
+        return job_id
+
+    def _run(self, job_id, cancel_event, job, args):
+        try:
+            result, error = job(cancel_event, *args), None
+        except FetchCancelled:
+            return
+        except Exception as e:
+            result, error = None, e
+
+        if not cancel_event.is_set():
+            self.results.put((job_id, result, error))
+
+    # Function to cancel the job in flight, if any
+    def cancel(self):
+        with self._lock:
+            if self._cancel_event is not None:
+                self._cancel_event.set()
+                self._cancel_event = None
+
+    def is_busy(self):
+        with self._lock:
+            return self._cancel_event is not None
+
+    # Function to hand finished jobs to the callbacks (call from the Tk thread)
+    def poll(self, on_result, on_error):
+        while True:
+            try:
+                job_id, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+
+            with self._lock:
+                if job_id != self._job_id or self._cancel_event is None:
+                    continue  # Superseded or cancelled while queued
+                self._cancel_event = None
+
+            if error is not None:
+                on_error(error)
+            else:
+                on_result(result)
@@ -0,0 +1,673 @@
+import os
+import queue
+from tkinter import StringVar, messagebox, Frame
+import tkinter as tk
+from tkinter import ttk
+from .account_poller import AccountPoller
+from .config import read_base_url, read_config, read_environment, read_nav_refresh_seconds
+from .fetch_executor import FetchExecutor, FetchCancelled
+from .intraday_levels import fetch_intraday_levels
+from .instrument_catalog import (CATEGORIES, InstrumentCatalog, fetch_account_instruments,
+                                 format_forex_pair, read_favorites)
+from .key_levels import fetch_key_level_index, format_key_levels, previous_trading_days
+from .oanda_client import get_client
+from .position_size import ConversionRates, calculate_position_sizes
+from .scanner import SCAN_COLUMNS, scan_instruments, scan_row
+from .stop_loss import DEFAULT_PERCENTAGES, calculate_stop_loss_matrix
+from .virtual_list import VirtualCheckList
+
+# Set by main() from the chosen environment
+OANDA_URL = None
+
+global_favorites_button = None
+global_progress_bar = None
+global_key_levels = None
+global_scan_table = None
+global_scan_status = None
+global_nav = None
+key_level_indexes = {}
+fetch_executor = FetchExecutor()
+scan_executor = FetchExecutor()
+sizing_executor = FetchExecutor()
+catalog_executor = FetchExecutor()
+catalog_callbacks = []
+
+
+# Function to fetch data and update GUI
+def fetch_data():
+    global global_progress_bar, global_key_levels
+    try:
+        # Read the inputs on the Tk thread; the worker thread must not touch Tk variables
+        instrument = format_forex_pair(pair_var.get())
+        float(entry_price_var.get())  # Reject a bad entry price before fetching anything
+
+        # Daily key levels only change once per trading day, so reuse today's index if we have it;
+        # intraday levels move all day and are synced again on every fetch
+        utc_now, day_dates = previous_trading_days()
+        index = key_level_indexes.get((instrument, day_dates[0].date()))
+        intraday = intraday_var.get()
+        if index is not None and not intraday:
+            fetch_executor.cancel()
+            hide_progress_bar()
+            global_key_levels = index
+            show_key_levels()
+            return
+
+        # Display loading message and show progress bar
+        result_label.config(text="Fetching data, please wait...")
+        if global_progress_bar is None:
+            global_progress_bar = ttk.Progressbar(result_frame, mode='indeterminate')
+            global_progress_bar.pack(pady=5)
+            global_progress_bar.start()
+
+        # Run the fetch in the background, replacing any fetch still in flight
+        fetch_executor.submit(perform_data_fetch, instrument, utc_now, day_dates, index, intraday)
+
+    except Exception as e:
+        messagebox.showerror("Error", str(e))
+
+def perform_data_fetch(cancelled, instrument, utc_now, day_dates, index, intraday):
+    if index is None:
+        index = fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, OANDA_URL)
+    if cancelled.is_set():
+        raise FetchCancelled()
+    shown = index
+    if intraday:
+        shown = index.with_levels(*fetch_intraday_levels(cancelled, api_key, account_id, instrument, OANDA_URL))
+    return (instrument, day_dates[0].date()), index, shown
+
+def perform_scan(cancelled, instruments, cached_indexes, utc_now, day_dates):
+    to_fetch = [instrument for instrument in instruments if instrument not in cached_indexes]
+    indexes, errors = scan_instruments(
+        cancelled, to_fetch,
+        lambda instrument: fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, OANDA_URL)
+    )
+    indexes.update(cached_indexes)
+    return day_dates[0].date(), indexes, errors
+
+# Function to show the key levels of the current index for the entered price and direction
+def show_key_levels(*args):
+    if global_key_levels is None:
+        return
+    try:
+        direction = direction_var.get().upper()
+        entry_price = float(entry_price_var.get())
+        two_to_one_price_str = two_to_one_price_var.get()
+        two_to_one_price = float(two_to_one_price_str) if two_to_one_price_str else None
+    except ValueError:
+        return  # Still typing; keep the last result on screen
+
+    levels = format_key_levels(global_key_levels, direction, entry_price, two_to_one_price)
+    result_label.config(text=f"{global_key_levels.instrument} ({global_key_levels.trading_day}):\n{levels}")
+
+# Function to stop and hide the progress bar
+def hide_progress_bar():
+    global global_progress_bar
+    if global_progress_bar is not None:
+        global_progress_bar.stop()
+        global_progress_bar.destroy()
+        global_progress_bar = None
+
+def show_fetch_result(result):
+    global global_key_levels
+    hide_progress_bar()
+    key, key_level_indexes[key], global_key_levels = result
+    show_key_levels()
+
+def show_fetch_error(error):
+    hide_progress_bar()
+    result_label.config(text="")
+    messagebox.showerror("Error", str(error))
+
+# Function to deliver background fetch results to the GUI
+def poll_fetch_results():
+    fetch_executor.poll(show_fetch_result, show_fetch_error)
+    scan_executor.poll(show_scan_result, show_scan_error)
+    sizing_executor.poll(show_position_size, show_position_size_error)
+    catalog_executor.poll(show_catalog_result, show_catalog_error)
+    root.after(100, poll_fetch_results)
+
+# Function to scan the key levels of every instrument in the dropdown
+def scan_key_levels():
+    global global_scan_table, global_scan_status
+    instruments = list(instrument_combobox['values'])
+    if not instruments:
+        messagebox.showwarning("Warning", "There are no instruments to scan.")
+        return
+
+    utc_now, day_dates = previous_trading_days()
+    day = day_dates[0].date()
+    cached_indexes = {i: key_level_indexes[(i, day)] for i in instruments if (i, day) in key_level_indexes}
+
+    if global_scan_table is None:
+        window = tk.Toplevel(root)
+        window.title("Key Level Scanner")
+
+        global_scan_status = ttk.Label(window, text="", font=font_medium, justify="left")
+        global_scan_status.pack(anchor="w", padx=5, pady=5)
+
+        global_scan_table = ttk.Treeview(window, columns=SCAN_COLUMNS, show="headings", height=20)
+        for column in SCAN_COLUMNS:
+            global_scan_table.heading(column, text=column,
+                                      command=lambda c=column: sort_scan_table(c, False))
+            global_scan_table.column(column, width=110, anchor="w")
+        scrollbar = ttk.Scrollbar(window, orient="vertical", command=global_scan_table.yview)
+        global_scan_table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        global_scan_table.pack(side="left", fill="both", expand=True)
+
+        window.protocol("WM_DELETE_WINDOW", lambda: close_scan_window(window))
+
+    global_scan_status.config(text=f"Scanning {len(instruments)} instruments, please wait...")
+    scan_executor.submit(perform_scan, instruments, cached_indexes, utc_now, day_dates)
+
+def close_scan_window(window):
+    global global_scan_table, global_scan_status
+    scan_executor.cancel()
+    global_scan_table = global_scan_status = None
+    window.destroy()
+
+# Function to sort the scanner table by a column, numbers numerically
+def sort_scan_table(column, reverse):
+    def sort_key(value):
+        try:
+            return 0, float(value)
+        except ValueError:
+            return 1, value
+
+    rows = [(global_scan_table.set(item, column), item) for item in global_scan_table.get_children("")]
+    rows.sort(key=lambda row: sort_key(row[0]), reverse=reverse)
+    for position, (_, item) in enumerate(rows):
+        global_scan_table.move(item, "", position)
+    global_scan_table.heading(column, command=lambda: sort_scan_table(column, not reverse))
+
+def show_scan_result(result):
+    day, indexes, errors = result
+    for instrument, index in indexes.items():
+        key_level_indexes[(instrument, day)] = index
+    if global_scan_table is None:
+        return  # Window closed while scanning
+
+    global_scan_table.delete(*global_scan_table.get_children(""))
+    for instrument in sorted(indexes):
+        global_scan_table.insert("", "end", values=scan_row(indexes[instrument]))
+
+    status = f"Scanned {len(indexes)} instruments for {day}."
+    if errors:
+        status += "\n" + "\n".join(f"{instrument}: {error}" for instrument, error in sorted(errors.items()))
+    global_scan_status.config(text=status)
+
+def show_scan_error(error):
+    if global_scan_status is not None:
+        global_scan_status.config(text="")
+    messagebox.showerror("Error", str(error))
+
+# Function to drop the shown key levels, e.g. when another instrument is picked
+def clear_key_levels(*args):
+    global global_key_levels
+    global_key_levels = None
+    fetch_executor.cancel()
+    hide_progress_bar()
+    result_label.config(text="")
+
+def clear_inputs():
+    clear_key_levels()
+    direction_var.set("LONG")
+    entry_price_var.set("")
+    two_to_one_price_var.set("")  # Clear the 2:1 price field
+
+def fetch_instruments(api_key, account_id, category):
+    # Served from the cached instrument catalog; only a stale catalog goes to the network
+    return instrument_catalog.instruments(category)
+
+# Function to run `then` on the Tk thread once the instrument catalog is in memory
+def with_instrument_catalog(then):
+    """A catalog that has to come from disk or OANDA is loaded on a worker thread, so
+    the window does not freeze while the network is slow or down."""
+    if instrument_catalog.is_loaded():
+        then()
+        return
+    catalog_callbacks.append(then)
+    if not catalog_executor.is_busy():
+        catalog_executor.submit(load_instrument_catalog)
+
+def load_instrument_catalog(cancelled):
+    instrument_catalog.categories()
+
+def show_catalog_result(result):
+    callbacks = catalog_callbacks[:]
+    catalog_callbacks.clear()
+    for then in callbacks:
+        then()
+
+def show_catalog_error(error):
+    catalog_callbacks.clear()
+    messagebox.showerror("Error", str(error))
+
+
+def update_instruments_dropdown(*args):
+    selected_category = category_var.get()
+    use_favorites = favorites_var.get()
+
+    if use_favorites:
+        category_combobox.set("Favorites")  # Set category to "Favorites"
+        category_combobox['state'] = 'readonly'
+        instruments = read_favorite_instruments()
+        instrument_combobox['values'] = instruments
+        if instruments:
+            pair_var.set(instruments[0])
+    else:
+        category_combobox['state'] = 'normal'
+        categories = CATEGORIES
+        category_combobox['values'] = categories
+
+        if not selected_category or selected_category not in categories:
+            # If no category is selected or an invalid category is chosen, default to "Forex"
+            selected_category = "Forex"
+            category_combobox.set(selected_category)
+
+        if not instrument_catalog.is_loaded():
+            instrument_combobox['values'] = []
+            with_instrument_catalog(update_instruments_dropdown)
+            return
+        try:
+            instruments = fetch_instruments(api_key, account_id, selected_category)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            instruments = []
+        instrument_combobox['values'] = instruments
+
+        if instruments:
+            pair_var.set(instruments[0])
+        else:
+            pair_var.set("Forex")
+
+def fetch_all_instruments(api_key, account_id):
+    return instrument_catalog.all_instruments()
+
+# Function to check and create the favorites button
+def check_create_favorites_button():
+    global global_favorites_button
+    if global_favorites_button is None:
+        if not os.path.exists("favorites.txt"):
+            global_favorites_button = ttk.Button(frame, text="Create Favorites List", command=create_favorites)
+        else:
+            global_favorites_button = ttk.Button(frame, text="Edit Favorites List", command=edit_favorites)
+        global_favorites_button.pack(pady=5)
+    else:
+        if not os.path.exists("favorites.txt"):
+            global_favorites_button.config(text="Create Favorites List", command=create_favorites)
+        else:
+            global_favorites_button.config(text="Edit Favorites List", command=edit_favorites)
+
+
+
+def read_favorite_instruments(file_name='favorites.txt'):
+    try:
+        return read_favorites(file_name)
+    except FileNotFoundError:
+        messagebox.showwarning("Warning", f"Favorites file '{file_name}' not found.")
+        return []
+
+# Function to create or edit favorites
+def create_favorites():
+    with_instrument_catalog(lambda: show_favorites_window("create", fetch_all_instruments(api_key, account_id)))
+
+def edit_favorites():
+    with_instrument_catalog(lambda: show_favorites_window("edit", fetch_all_instruments(api_key, account_id)))
+
+# Function to update NAV and risk amounts in the GUI
+def update_nav_label(nav):
+    global global_nav
+    global_nav = nav
+    currency = account_poller.currency
+    nav_label.config(text=f"Current NAV: {nav} {currency}")
+
+    # Calculate and update the 1/2/3% risk amounts
+    risk_amount1 = 0.01 * float(nav)
+    risk_amount2 = 0.02 * float(nav)
+    risk_amount3 = 0.03 * float(nav)
+    risk_label1.config(text=f"Your 1% risk amount is {risk_amount1:.2f} {currency}")
+    risk_label2.config(text=f"Your 2% risk amount is {risk_amount2:.2f} {currency}")
+    risk_label3.config(text=f"Your 3% risk amount is {risk_amount3:.2f} {currency}")
+
+# Function to size a position from the NAV, the risk % and the entry and stop prices
+def calculate_units():
+    try:
+        instrument = format_forex_pair(pair_var.get())
+        entry = float(entry_price_var.get())
+        stop = float(stop_price_var.get())
+        risk_percent = float(risk_percent_var.get())
+    except ValueError:
+        messagebox.showerror("Error", "Invalid input. Please enter valid numeric values for Entry Price, Stop Price and Risk %.")
+        return
+    if global_nav is None:
+        messagebox.showwarning("Warning", "The NAV has not been loaded yet.")
+        return
+
+    position_size_label.config(text="Calculating...")
+    sizing_executor.submit(perform_position_sizing, global_nav, risk_percent, instrument, entry, stop)
+
+# Function to size the position (runs on a worker thread)
+def perform_position_sizing(cancelled, nav, risk_percent, instrument, entry, stop):
+    size = calculate_position_sizes(nav, risk_percent, [(instrument, entry, stop)],
+                                    conversion_rates, instrument_catalog.pip_location, instrument_catalog.unit_precision)[0]
+    return size, "buy" if stop < entry else "sell"
+
+def show_position_size(result):
+    size, side = result
+    currency = account_poller.currency
+    position_size_label.config(text=f"Units to {side}: {size.units}\n"
+                                    f"Stop distance: {size.stop_pips:.1f} pips\n"
+                                    f"Risk: {size.risk_amount:.2f} {currency} ({size.pip_value:.2f} {currency} per pip)")
+
+def show_position_size_error(error):
+    position_size_label.config(text="")
+    messagebox.showerror("Error", str(error))
+
+# Function to redraw the NAV whenever the background poller reports a change
+def poll_account_updates():
+    while True:
+        try:
+            kind, value = account_poller.updates.get_nowait()
+        except queue.Empty:
+            break
+        if kind == "balance":
+            update_nav_label(value)
+        else:
+            messagebox.showerror("Error", str(value))
+    root.after(200, poll_account_updates)
+
+def show_favorites_window(mode, all_instruments):
+    window = tk.Toplevel(root)
+    window.title("Select Favorites")
+
+    # Read the saved favorites once; the ticked state lives in this dict, not in widgets
+    favorites = set()
+    if mode == "edit" and os.path.exists("favorites.txt"):
+        favorites = set(read_favorite_instruments())
+    checked = {instrument: instrument in favorites for instrument in all_instruments}
+
+    instruments_list = VirtualCheckList(window, checked)
+    instruments_list.show(all_instruments)
+
+    search_var = tk.StringVar()
+    search_index = {instrument: instrument.lower() for instrument in all_instruments}
+    last_search = {"text": "", "matches": set(all_instruments)}
+
+    def update_favorites():
+        favorites = [instrument for instrument, ticked in checked.items() if ticked]
+        favorites.sort()  # Sort the favorites alphabetically
+        with open("favorites.txt", "w") as file:
+            for fav in favorites:
+                file.write(f"{fav}\n")
+        window.destroy()
+        check_create_favorites_button()
+
+    def update_instruments_list(*args):
+        search_text = search_var.get().lower()
+        if search_text == last_search["text"]:
+            return
+
+        # Typing more only narrows the previous matches, so there is no need to rescan everything
+        if search_text.startswith(last_search["text"]):
+            candidates = last_search["matches"]
+        else:
+            candidates = search_index
+        matches = {instrument for instrument in candidates if search_text in search_index[instrument]}
+        last_search["text"], last_search["matches"] = search_text, matches
+
+        instruments_list.show([instrument for instrument in all_instruments if instrument in matches])
+
+    search_entry = tk.Entry(window, textvariable=search_var, width=30)
+    search_entry.pack(pady=5)
+    search_entry.bind("<KeyRelease>", update_instruments_list)
+
+    ttk.Button(window, text="Submit", command=update_favorites).pack(pady=5)
+
+# Function to parse a comma or space separated list of numbers
+def parse_numbers(text):
+    return [float(value) for value in text.replace(",", " ").split()]
+
+def update_stop_losses():
+    try:
+        swing_prices = parse_numbers(swing_price_var.get())
+        percentages = parse_numbers(stop_percentages_var.get())
+        direction = stop_loss_direction_var.get()
+
+        if not swing_prices or not percentages or not direction:
+            messagebox.showwarning("Warning", "Please enter the Swing Price(s), the Stop % and select the Direction.")
+            return
+
+        stop_losses = calculate_stop_loss_matrix(swing_prices, direction, percentages)
+
+        # Display one row per swing price and one column per percentage
+        columns = ["Swing"] + [f"{percentage:g}%" for percentage in percentages]
+        stop_loss_table.delete(*stop_loss_table.get_children())
+        stop_loss_table["columns"] = columns
+        for column in columns:
+            stop_loss_table.heading(column, text=column)
+            stop_loss_table.column(column, width=80, anchor="w")
+        for swing_price, row in zip(swing_prices, stop_losses):
+            stop_loss_table.insert("", "end", values=[swing_price] + [f"{value:.6f}" for value in row])
+
+    except ValueError:
+        messagebox.showerror("Error", "Invalid input. Please enter valid numeric values for Swing Price and Stop %.")
+
+def clear_stop_loss_inputs():
+    swing_price_var.set("")  # Clear swing high/low input
+    stop_percentages_var.set(", ".join(f"{percentage:g}" for percentage in DEFAULT_PERCENTAGES))
+    stop_loss_direction_var.set("LONG")  # Reset direction to LONG
+    stop_loss_table.delete(*stop_loss_table.get_children())  # Clear the calculated stop losses
+
+
+# GUI setup
+def main(environment=None, config_file='config.ini'):
+    """Opens the tool for the "demo", "live" or "mock" account; by default the one named in the config."""
+    # The widgets, Tk variables and account objects below are used by the callbacks above
+    global OANDA_URL, root, font_medium, frame, result_frame, result_label, api_key, account_id
+    global account_poller, instrument_catalog, conversion_rates, nav_label, risk_label1, risk_label2, risk_label3
+    global stop_price_var, risk_percent_var, position_size_label
+    global stop_loss_direction_var, swing_price_var, stop_percentages_var, stop_loss_table, pair_var, direction_var
+    global entry_price_var, two_to_one_price_var, intraday_var, category_var, favorites_var, category_combobox, instrument_combobox
+
+    environment = environment or read_environment(config_file)
+    OANDA_URL = read_base_url(config_file, environment)
+
+    root = tk.Tk()
+    root.title(f"Vijay's Day Trading Tool ({environment.capitalize()})")
+    root.geometry("900x750")
+
+    style = ttk.Style()
+    font_large = tk.font.Font(family="Calibri", size=14)
+    font_medium = tk.font.Font(family="Calibri", size=12)
+    style.configure("TButton", padding=5, font=font_medium)
+    style.configure("TLabel", font=font_medium)
+    style.configure("TRadiobutton", font=font_medium)
+
+    # Header label for risk amount calculator
+    risk_header_label = ttk.Label(root, text="Risk Amount Calculator", font=('Calibri', 14, 'bold'))
+    risk_header_label.pack(side="top", anchor="nw", padx=10, pady=10)
+
+    # Create a label for displaying the NAV
+    nav_label = ttk.Label(root, text="Current NAV: N/A", font=font_large)
+    nav_label.pack(anchor="nw", padx=10, pady=10)
+
+    # Label for displaying 3% risk amount
+    risk_label1 = ttk.Label(root, text="Your 1% risk amount is N/A", font=font_medium)
+    risk_label1.pack(anchor="nw", padx=10, pady=10)
+
+    risk_label2 = ttk.Label(root, text="Your 2% risk amount is N/A", font=font_medium)
+    risk_label2.pack(anchor="nw", padx=10, pady=10)
+
+    risk_label3 = ttk.Label(root, text="Your 3% risk amount is N/A", font=font_medium)
+    risk_label3.pack(anchor="nw", padx=10, pady=10)
+
+    # Button to manually update NAV
+    ttk.Button(root, text="Update NAV", command=lambda: account_poller.refresh_now()).pack(side="top", anchor="nw", padx=10)
+
+    # Position size calculator, for the instrument and entry price of the key levels form
+    position_size_frame = Frame(root)
+    position_size_frame.pack(side="top", anchor="nw", padx=10, pady=10)
+
+    stop_price_label = ttk.Label(position_size_frame, text="Stop Price", font=font_medium)
+    stop_price_label.grid(row=0, column=0, sticky="w", pady=2)
+    stop_price_var = StringVar()
+    ttk.Entry(position_size_frame, textvariable=stop_price_var, font=font_medium, width=10).grid(row=0, column=1, pady=2)
+
+    risk_percent_label = ttk.Label(position_size_frame, text="Risk %", font=font_medium)
+    risk_percent_label.grid(row=1, column=0, sticky="w", pady=2)
+    risk_percent_var = StringVar(value="1")
+    ttk.Entry(position_size_frame, textvariable=risk_percent_var, font=font_medium, width=10).grid(row=1, column=1, pady=2)
+
+    ttk.Button(position_size_frame, text="Calculate Units", command=calculate_units).grid(row=2, column=0, columnspan=2, pady=5)
+
+    position_size_label = ttk.Label(position_size_frame, text="", font=font_medium, justify="left")
+    position_size_label.grid(row=3, column=0, columnspan=2, sticky="w")
+
+    # Create a separate frame for the stop loss calculator
+    stop_loss_frame = Frame(root)
+    stop_loss_frame.place(relx=0.98, rely=0, anchor="ne")
+
+    # Header label for stop loss calculator
+    stop_loss_header_label = ttk.Label(stop_loss_frame, text="Stop Loss Calculator", font=('Calibri', 14, 'bold'))
+    stop_loss_header_label.grid(row=0, column=0, columnspan=2, pady=10)
+
+    # Are you going long or short?
+    stop_loss_direction_label = ttk.Label(stop_loss_frame, text="Are you going long or short?", font=font_medium)
+    stop_loss_direction_label.grid(row=1, column=0, columnspan=2, pady=5)
+
+    # Direction selection for stop loss
+    stop_loss_direction_var = StringVar(value="LONG")
+    ttk.Radiobutton(stop_loss_frame, text="Long (-0.03%)", variable=stop_loss_direction_var, value="LONG").grid(row=2, column=0)
+    ttk.Radiobutton(stop_loss_frame, text="Short (+0.03%)", variable=stop_loss_direction_var, value="SHORT").grid(row=2, column=1)
+
+    # Swing high/low input; several prices separated by commas give one row each
+    swing_price_label = ttk.Label(stop_loss_frame, text="Swing high/low(s)", font=font_medium)
+    swing_price_label.grid(row=3, column=0, pady=5)
+    swing_price_var = StringVar()
+    swing_price_entry = ttk.Entry(stop_loss_frame, textvariable=swing_price_var, font=font_medium)
+    swing_price_entry.grid(row=3, column=1, pady=5)
+
+    # Stop percentages input
+    stop_percentages_label = ttk.Label(stop_loss_frame, text="Stop %", font=font_medium)
+    stop_percentages_label.grid(row=4, column=0, pady=5)
+    stop_percentages_var = StringVar(value=", ".join(f"{percentage:g}" for percentage in DEFAULT_PERCENTAGES))
+    stop_percentages_entry = ttk.Entry(stop_loss_frame, textvariable=stop_percentages_var, font=font_medium)
+    stop_percentages_entry.grid(row=4, column=1, pady=5)
+
+    # Calculate Stop Loss button
+    calculate_stop_losses_button = ttk.Button(stop_loss_frame, text="Calculate Stop Losses", command=update_stop_losses)
+    calculate_stop_losses_button.grid(row=5, column=0, columnspan=2, pady=5)
+
+    # Clear button for stop loss calculator
+    clear_stop_loss_button = ttk.Button(stop_loss_frame, text="Clear", command=clear_stop_loss_inputs)
+    clear_stop_loss_button.grid(row=6, column=0, columnspan=2, pady=5)
+
+    # Stop Loss table, one row per swing price
+    stop_loss_table = ttk.Treeview(stop_loss_frame, show="headings", height=5)
+    stop_loss_table.grid(row=7, column=0, columnspan=2, pady=5)
+
+    frame = Frame(root, pady=10)
+    frame.place(relx=0.5, rely=0.385, anchor="center")  # Move the frame up
+
+    api_key, account_id = read_config(config_file, environment)
+    account_poller = AccountPoller(get_client(api_key, OANDA_URL).get, account_id, read_nav_refresh_seconds(config_file))
+    instrument_catalog = InstrumentCatalog(lambda: fetch_account_instruments(api_key, account_id, OANDA_URL),
+                                           path=f"instruments_{account_id}.json")
+    conversion_rates = ConversionRates(get_client(api_key, OANDA_URL).get, account_id)
+
+    pair_var = StringVar()
+    direction_var = StringVar(value="LONG")
+    entry_price_var = StringVar()
+    category_var = StringVar(value="Forex")
+    favorites_var = tk.BooleanVar(value=False)
+
+    # Header label for take profit key levels
+    take_profit_header_label = ttk.Label(frame, text="Take Profit Key Levels", font=('Calibri', 14, 'bold'))
+    take_profit_header_label.pack(anchor="nw", pady=5)
+
+    # Instruments dropdown
+    category_label = ttk.Label(frame, text="Category", font=font_medium)
+    category_label.pack(pady=5)
+    category_combobox = ttk.Combobox(frame, textvariable=category_var, values=CATEGORIES, font=font_medium)
+    category_combobox.pack(pady=5)
+
+    # Pair dropdown
+    pair_label = ttk.Label(frame, text="Instrument", font=font_medium)
+    pair_label.pack(pady=5)
+    instrument_combobox = ttk.Combobox(frame, textvariable=pair_var, font=font_medium)
+    instrument_combobox.pack(pady=5)
+
+    # Favorites
+    favorites_frame = ttk.Frame(frame)
+    favorites_frame.pack(pady=5)
+
+    favorites_label = ttk.Label(favorites_frame, text="Use Favorites", font=font_medium)
+    favorites_label.pack(side="left")
+
+    favorites_checkbutton = ttk.Checkbutton(favorites_frame, variable=favorites_var, command=update_instruments_dropdown)
+    favorites_checkbutton.pack(side="left")
+
+    # Update UI elements based on saved favorites
+    check_create_favorites_button()
+
+    # Direction selection
+    direction_label = ttk.Label(frame, text="Direction", font=font_medium)
+    direction_label.pack(pady=5)
+    ttk.Radiobutton(frame, text="Long", variable=direction_var, value="LONG").pack()
+    ttk.Radiobutton(frame, text="Short", variable=direction_var, value="SHORT").pack()
+
+    # Entry price
+    entry_price_label = ttk.Label(frame, text="Entry Price", font=font_medium)
+    entry_price_label.pack(pady=5)
+    entry_price_entry = ttk.Entry(frame, textvariable=entry_price_var, font=font_medium)
+    entry_price_entry.pack(pady=5)
+
+    # 2:1 price input
+    two_to_one_price_var = StringVar()
+    two_to_one_price_label = ttk.Label(frame, text="Your 2:1 price", font=font_medium)
+    two_to_one_price_label.pack(pady=5)
+    two_to_one_price_entry = ttk.Entry(frame, textvariable=two_to_one_price_var, font=font_medium)
+    two_to_one_price_entry.pack(pady=5)
+
+    # Intraday levels toggle
+    intraday_var = tk.BooleanVar(value=False)
+    intraday_checkbutton = ttk.Checkbutton(frame, text="Include intraday levels (H4/H1 swings, sessions)", variable=intraday_var)
+    intraday_checkbutton.pack(pady=5)
+
+    # Fetch data button
+    fetch_button = ttk.Button(frame, text="Fetch Data", command=fetch_data)
+    fetch_button.pack(pady=5)
+
+    # Clear button
+    clear_button = ttk.Button(frame, text="Clear", command=clear_inputs)
+    clear_button.pack(pady=5)
+
+    # Scan button
+    scan_button = ttk.Button(frame, text="Scan All Instruments", command=scan_key_levels)
+    scan_button.pack(pady=5)
+
+    # Create a separate frame for the result label
+    result_frame = Frame(root, pady=10)
+    result_frame.pack(side="bottom", anchor="n", pady=5)  # Adjust side and anchor as needed
+
+    # Result label
+    result_label = ttk.Label(result_frame, text="", font=('Calibri', 11), justify="left")
+    result_label.pack(pady=5)
+
+    # Update UI elements based on saved favorites
+    category_var.trace("w", update_instruments_dropdown)
+    favorites_var.trace("w", update_instruments_dropdown)
+    pair_var.trace("w", clear_key_levels)
+    direction_var.trace("w", show_key_levels)
+    entry_price_var.trace("w", show_key_levels)
+    two_to_one_price_var.trace("w", show_key_levels)
+    update_instruments_dropdown()
+
+    poll_fetch_results()
+    account_poller.start()
+    poll_account_updates()
+
+    root.mainloop()
+
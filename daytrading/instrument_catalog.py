@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from .oanda_client import PRACTICE_URL, get_client
+
+CATEGORIES = ["Forex", "Indices", "Commodities"]
+
+# OANDA asset classes (from the instrument's ASSET_CLASS tag) that count as commodities
+COMMODITY_ASSET_CLASSES = {"COMMODITY", "CRYPTO", "METAL"}
+
+
+# Function to format the forex pair input
+def format_forex_pair(pair):
+    formatted = pair.upper().replace("/", "_").replace("-", "_")
+    return formatted if "_" in formatted else formatted[:3] + "_" + formatted[3:]
+
+# Function to read the favorites list; raises FileNotFoundError if there is none
+def read_favorites(file_name='favorites.txt'):
+    with open(file_name, 'r') as file:
+        favorites = file.read().splitlines()
+    return [instrument.strip() for instrument in favorites if instrument.strip()]
+
+# Function to fetch the raw instrument list of the account from OANDA
+def fetch_account_instruments(api_key, account_id, base_url=PRACTICE_URL):
+    data = get_client(api_key, base_url).get(f"/v3/accounts/{account_id}/instruments")
+    return data['instruments']
+
+# Function to pick the dropdown category for an OANDA instrument
+def instrument_category(instrument):
+    if instrument["type"] == "CURRENCY":
+        return "Forex"
+    if instrument["type"] == "METAL":
+        return "Commodities"
+    asset_classes = {tag["name"] for tag in instrument.get("tags", []) if tag.get("type") == "ASSET_CLASS"}
+    return "Commodities" if asset_classes & COMMODITY_ASSET_CLASSES else "Indices"
+
+
+class InstrumentCatalog:
+    """The account's tradeable instruments grouped into CATEGORIES, with their pip locations
+    and unit precisions, cached in memory and on disk.
+
+    fetch() must return the raw instrument list from OANDA's /accounts/{id}/instruments.
+    The disk copy is reused for `ttl` seconds; if a refresh fails, a stale copy is
+    better than nothing and is used instead. After a failed refresh the network is not
+    tried again for `retry_after` seconds, so lookups made while offline stay fast.
+    """
+
+    def __init__(self, fetch, path="instruments.json", ttl=24 * 60 * 60, retry_after=60):
+        self.fetch = fetch
+        self.path = path
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._categories = None
+        self._pip_locations = None
+        self._unit_precisions = None
+        self._loaded_at = 0
+        self._failure = None  # (time, error) of the last failed fetch with no copy to fall back on
+
+    def _read_disk(self):
+        try:
+            with open(self.path, "r") as file:
+                cached = json.load(file)
+            # Copies saved before unit precisions were kept still serve as a stale fallback
+            if "unit_precisions" not in cached:
+                return cached["categories"], cached["pip_locations"], {}, 0
+            return cached["categories"], cached["pip_locations"], cached["unit_precisions"], cached["fetched_at"]
+        except (OSError, ValueError, KeyError):
+            return None, None, None, 0
+
+    def _fetch(self):
+        categories = {category: [] for category in CATEGORIES}
+        pip_locations = {}
+        unit_precisions = {}
+        for instrument in self.fetch():
+            categories[instrument_category(instrument)].append(instrument["name"])
+            pip_locations[instrument["name"]] = instrument["pipLocation"]
+            unit_precisions[instrument["name"]] = instrument.get("tradeUnitsPrecision", 0)
+        for names in categories.values():
+            names.sort()
+
+        fetched_at = time.time()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"fetched_at": fetched_at, "categories": categories, "pip_locations": pip_locations,
+                       "unit_precisions": unit_precisions}, file)
+        os.replace(tmp_path, self.path)
+        return categories, pip_locations, unit_precisions, fetched_at
+
+    # Function to load the catalog, fetching only when memory and disk are both stale
+    def _load(self):
+        with self._lock:
+            if not self._is_loaded():
+                categories, pip_locations, unit_precisions, fetched_at = self._read_disk()
+                if categories is None or time.time() - fetched_at > self.ttl:
+                    if self._failure is not None and time.time() - self._failure[0] < self.retry_after:
+                        raise self._failure[1]
+                    try:
+                        categories, pip_locations, unit_precisions, fetched_at = self._fetch()
+                        self._failure = None
+                    except Exception as e:
+                        if categories is None:
+                            self._failure = (time.time(), e)
+                            raise
+                        # Keep the stale copy and only try the network again after retry_after
+                        fetched_at = time.time() - self.ttl + self.retry_after
+                self._categories, self._pip_locations, self._unit_precisions = categories, pip_locations, unit_precisions
+                self._loaded_at = fetched_at
+            return self._categories, self._pip_locations, self._unit_precisions
+
+    def _is_loaded(self):
+        return self._categories is not None and time.time() - self._loaded_at <= self.ttl
+
+    # Function to tell whether lookups can be answered from memory, without the network or disk
+    def is_loaded(self):
+        with self._lock:
+            return self._is_loaded()
+
+    def categories(self):
+        return self._load()[0]
+
+    def instruments(self, category):
+        return self.categories().get(category, [])
+
+    def all_instruments(self):
+        return sorted(name for names in self.categories().values() for name in names)
+
+    # Function to get the pip location (the exponent of one pip, e.g. -4 for EUR_USD)
+    def pip_location(self, instrument):
+        pip_locations = self._load()[1]
+        if instrument not in pip_locations:
+            raise Exception(f"Unknown instrument {instrument}.")
+        return pip_locations[instrument]
+
+    # Function to get how many decimals of units the instrument trades in (0 for whole units)
+    def unit_precision(self, instrument):
+        _, pip_locations, unit_precisions = self._load()
+        if instrument not in pip_locations:
+            raise Exception(f"Unknown instrument {instrument}.")
+        return unit_precisions.get(instrument, 0)
+
+    # Function to drop the cached copy so the next lookup refetches
+    def invalidate(self):
+        with self._lock:
+            self._categories = None
+            self._pip_locations = None
+            self._unit_precisions = None
+            self._loaded_at = 0
+            self._failure = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .candles import fetch_candles
+from .fetch_executor import FetchCancelled, fetch_concurrently
+from .oanda_client import PRACTICE_URL
+
+# Trading sessions as [start, end) hours in UTC
+SESSIONS = {"Asian": (0, 7), "London": (7, 16), "New York": (12, 21)}
+
+# How far back each granularity is kept in sync; only the delta is downloaded on a refresh
+INTRADAY_LOOKBACK = {"H4": timedelta(days=10), "H1": timedelta(days=3), "M15": timedelta(days=2)}
+
+# Granularities whose swing highs/lows become levels; sessions are measured on M15
+SWING_GRANULARITIES = ["H4", "H1"]
+
+# Candles on each side that a swing high/low must not be exceeded by
+SWING_WIDTH = 2
+
+
+# Function to get the high and low of the latest session that has started by now
+def session_range(candles, start_hour, end_hour, now):
+    """Returns (high, low), or None if no candle falls in the session in the last few days."""
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for days_back in range(4):  # Reaches back over a weekend
+        day = midnight - timedelta(days=days_back)
+        start, end = day + timedelta(hours=start_hour), day + timedelta(hours=end_hour)
+        if start > now:
+            continue
+        mask = (candles.time >= start.timestamp()) & (candles.time < end.timestamp())
+        if mask.any():
+            return float(candles.high[mask].max()), float(candles.low[mask].min())
+    return None
+
+# Function to find the latest swing high and swing low among closed candles
+def last_swing(candles, width=SWING_WIDTH):
+    """A swing high is a high that no candle within `width` candles either side exceeds
+    (likewise for lows). Returns (swing_high, swing_low), None where there is none."""
+    closed = candles.closed()
+    window = 2 * width + 1
+    if len(closed) < window:
+        return None, None
+    highs = np.flatnonzero(sliding_window_view(closed.high, window).argmax(axis=1) == width) + width
+    lows = np.flatnonzero(sliding_window_view(closed.low, window).argmin(axis=1) == width) + width
+    swing_high = float(closed.high[highs[-1]]) if len(highs) else None
+    swing_low = float(closed.low[lows[-1]]) if len(lows) else None
+    return swing_high, swing_low
+
+# Function to build the intraday levels of one price side from candles keyed by granularity
+def build_intraday_levels(candles_by_granularity, now, side="mid"):
+    candles_by_granularity = {granularity: candles.side(side) for granularity, candles in candles_by_granularity.items()}
+    levels = {}
+    for granularity in SWING_GRANULARITIES:
+        swing_high, swing_low = last_swing(candles_by_granularity[granularity])
+        if swing_high is not None:
+            levels[f"{granularity} Swing High"] = swing_high
+        if swing_low is not None:
+            levels[f"{granularity} Swing Low"] = swing_low
+
+    for session, (start_hour, end_hour) in SESSIONS.items():
+        session_levels = session_range(candles_by_granularity["M15"], start_hour, end_hour, now)
+        if session_levels is not None:
+            levels[f"{session} Session High"], levels[f"{session} Session Low"] = session_levels
+    return levels
+
+# Function to sync the intraday candles of one instrument and build its intraday levels
+def fetch_intraday_levels(cancelled, api_key, account_id, instrument, base_url=PRACTICE_URL, now=None):
+    now = now or datetime.now(timezone.utc)
+    candles_by_granularity = fetch_concurrently(cancelled, {
+        granularity: (fetch_candles, (api_key, account_id, instrument, now - lookback, now, base_url, granularity))
+        for granularity, lookback in INTRADAY_LOOKBACK.items()
+    })
+    if cancelled.is_set():
+        raise FetchCancelled()
+    # Bid-side levels for LONG targets and ask-side levels for SHORT targets
+    bid_levels = build_intraday_levels(candles_by_granularity, now, "bid")
+    ask_levels = build_intraday_levels(candles_by_granularity, now, "ask")
+    return bid_levels, ask_levels
@@ -0,0 +1,154 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from .candles import fetch_daily_candles
+from .oanda_client import PRACTICE_URL
+
+
+# Function to adjust for weekends
+def adjust_for_weekend(date):
+    while date.weekday() > 4:  # Adjust if Saturday (5) or Sunday (6)
+        date -= timedelta(days=1)
+    return date
+
+# Function to get the range for the previous year
+def get_previous_year_range(current_date):
+    previous_year = current_date.year - 1
+    start_of_previous_year = datetime(previous_year, 1, 1, tzinfo=timezone.utc)
+    end_of_previous_year = datetime(previous_year, 12, 31, tzinfo=timezone.utc)
+    return start_of_previous_year, end_of_previous_year
+
+# Function to get the previous three trading days (Singapore time)
+def previous_trading_days(now=None):
+    utc_now = (now or datetime.now(timezone.utc)) - timedelta(hours=8)  # Adjust for Singapore Time (GMT+8)
+    yesterday = adjust_for_weekend(utc_now - timedelta(days=1))
+    two_days_ago = adjust_for_weekend(yesterday - timedelta(days=1))
+    three_days_ago = adjust_for_weekend(two_days_ago - timedelta(days=1))
+    return utc_now, [yesterday, two_days_ago, three_days_ago]
+
+# Function to get the session date of every daily candle in a series
+def trading_dates(candles):
+    # OANDA daily candles open at 17:00 New York time, the evening before their session
+    return (candles.time + 12 * 60 * 60).astype("datetime64[s]").astype("datetime64[D]")
+
+# Function to pick the last closed sessions up to the first of dates, one per date, most recent first
+def slice_daily_candles(candles, dates):
+    """Sessions are matched by trading date rather than by the candle covering an instant:
+    a daily candle opens at 21:00 UTC the evening before its session, so an instant late
+    in the day falls in the next session's candle and over a weekend in the last one."""
+    sessions = np.flatnonzero(candles.complete & (trading_dates(candles) <= np.datetime64(dates[0].date(), "D")))
+    if len(sessions) < len(dates):
+        raise Exception(f"No data returned for {dates[-1].date()}.")
+    return sessions[::-1][:len(dates)]
+
+
+class KeyLevelIndex:
+    """Key levels of one instrument for one trading day, held in price order.
+
+    Built once per instrument and day; levels above or below any entry price are then
+    found with a bisect, so changing the entry or direction needs no refetch.
+
+    A LONG target fills when the bid reaches it and a SHORT target when the ask does, so
+    `levels` (bid side) serve above() and LONG trades while `ask_levels` serve below()
+    and SHORT trades. Without ask_levels both directions use `levels`.
+    """
+
+    def __init__(self, instrument, trading_day, levels, ask_levels=None):
+        self.instrument = instrument
+        self.trading_day = trading_day
+        self.levels = levels
+        self.ask_levels = levels if ask_levels is None else ask_levels
+        ordered = sorted(levels.items(), key=lambda item: item[1])
+        self.names = [name for name, _ in ordered]
+        self.prices = [price for _, price in ordered]
+        ordered = sorted(self.ask_levels.items(), key=lambda item: item[1])
+        self.ask_names = [name for name, _ in ordered]
+        self.ask_prices = [price for _, price in ordered]
+
+    # Function to list levels at or above a price, nearest first
+    def above(self, price):
+        index = bisect_left(self.prices, price)
+        return list(zip(self.names[index:], self.prices[index:]))
+
+    # Function to list levels at or below a price, nearest first
+    def below(self, price):
+        index = bisect_right(self.ask_prices, price)
+        return list(zip(reversed(self.ask_names[:index]), reversed(self.ask_prices[:index])))
+
+    # Function to list the take-profit levels for a trade, nearest first
+    def levels_for(self, direction, entry_price):
+        if direction == "LONG":
+            return self.above(entry_price)
+        elif direction == "SHORT":
+            return self.below(entry_price)
+        return list(zip(self.names, self.prices))
+
+    # Function to get a copy of the index with more levels added, e.g. intraday ones
+    def with_levels(self, levels, ask_levels=None):
+        ask_levels = levels if ask_levels is None else ask_levels
+        return KeyLevelIndex(self.instrument, self.trading_day,
+                             {**self.levels, **levels}, {**self.ask_levels, **ask_levels})
+
+
+# Function to add the high and low of the candles selected by a mask to the levels
+def add_extremes(levels, label, candles, mask):
+    if mask.any():
+        levels[f"{label} High"] = float(candles.high[mask].max())
+        levels[f"{label} Low"] = float(candles.low[mask].min())
+
+# Function to work out the key levels of one price side of a CandleSeries of daily candles
+def key_level_prices(candles, day_dates, previous_year):
+    """day_dates are the previous trading days, most recent first; candles must reach back
+    to the start of previous_year. Returns (trading day, {name: price})."""
+    days = slice_daily_candles(candles, day_dates)
+    dates = trading_dates(candles)
+    last_day = dates[days[0]].item()
+    levels = {"Close of previous day": float(candles.close[days[0]])}
+    for n, index in enumerate(days[1:], start=2):
+        levels[f"{n} days ago High"] = float(candles.high[index])
+        levels[f"{n} days ago Low"] = float(candles.low[index])
+
+    # Weeks start on Monday; the epoch (1970-01-01) was a Thursday
+    week_starts = dates - (dates.astype(np.int64) + 3) % 7
+    previous_week = np.datetime64(last_day - timedelta(days=last_day.weekday() + 7), "D")
+    previous_month = np.datetime64((last_day.replace(day=1) - timedelta(days=1)).replace(day=1), "M")
+    add_extremes(levels, "Previous Week", candles, week_starts == previous_week)
+    add_extremes(levels, "Previous Month", candles, dates.astype("datetime64[M]") == previous_month)
+    add_extremes(levels, "Previous Year", candles, dates.astype("datetime64[Y]") == np.datetime64(str(previous_year), "Y"))
+    return last_day, levels
+
+# Function to build the key-level index from a CandleSeries of daily candles
+def build_key_level_index(instrument, candles, day_dates, previous_year):
+    """Levels for LONG targets come from the bid side and for SHORT targets from the ask side."""
+    last_day, bid_levels = key_level_prices(candles.side("bid"), day_dates, previous_year)
+    _, ask_levels = key_level_prices(candles.side("ask"), day_dates, previous_year)
+    return KeyLevelIndex(instrument, last_day, bid_levels, ask_levels)
+
+# Function to fetch the history of one instrument and build its key-level index
+def fetch_key_level_index(api_key, account_id, instrument, utc_now, day_dates, base_url=PRACTICE_URL):
+    start_of_previous_year, _ = get_previous_year_range(utc_now)
+
+    # Fetching everything from the start of the previous year in one go; closed candles come from the store
+    candles = fetch_daily_candles(api_key, account_id, instrument, start_of_previous_year, day_dates[0], base_url)
+    return build_key_level_index(instrument, candles, day_dates, start_of_previous_year.year)
+
+# Function to filter prices based on entry price
+def filter_prices_based_on_entry(direction, entry_price, price_data, two_to_one_price=None):
+    filtered_data = dict(KeyLevelIndex(None, None, price_data).levels_for(direction, entry_price))
+
+    # If two_to_one_price is provided, add it to the filtered_data
+    if two_to_one_price is not None:
+        filtered_data["Your 2:1 price"] = two_to_one_price
+
+    return filtered_data
+
+# Function to format the take-profit levels for an entry price and direction
+def format_key_levels(index, direction, entry_price, two_to_one_price=None):
+    levels = index.levels_for(direction, entry_price)
+
+    # If two_to_one_price is provided, add it to the levels
+    if two_to_one_price is not None:
+        levels.append(("Your 2:1 price", two_to_one_price))
+        levels.sort(key=lambda level: level[1], reverse=(direction == "SHORT"))
+
+    return "\n".join([f"{name}: {price}" for name, price in levels])
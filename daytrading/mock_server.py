@@ -0,0 +1,717 @@
+import argparse
+import copy
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+# Recorded responses the mock account starts from
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+DEFAULT_PORT = 8765
+
+# Candle lengths in seconds (weekly and monthly candles are not served)
+GRANULARITY_SECONDS = {
+    "S5": 5, "S10": 10, "S15": 15, "S30": 30, "M1": 60, "M2": 120, "M4": 240, "M5": 300, "M10": 600,
+    "M15": 900, "M30": 1800, "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400, "H6": 21600, "H8": 28800,
+    "H12": 43200, "D": 86400,
+}
+
+# Daily candles open at 21:00 UTC (OANDA's 17:00 New York alignment); longer candles are aligned to it
+DAILY_ALIGNMENT = 21 * 3600
+
+# Most candles OANDA returns for one request, and how many it returns when no count is given
+MAX_CANDLES = 5000
+DEFAULT_CANDLES = 500
+
+WEEK = 7 * 86400
+
+
+# Function to mark the times at which the FX market is open (closed Friday 21:00 to Sunday 21:00 UTC)
+def market_open(times):
+    seconds_into_week = (np.asarray(times) + 3 * 86400) % WEEK  # The epoch was a Thursday
+    return ~((seconds_into_week >= 4 * 86400 + DAILY_ALIGNMENT) & (seconds_into_week < 6 * 86400 + DAILY_ALIGNMENT))
+
+# Function to get repeatable noise in [-1, 1] for each time
+def noise(times, seed):
+    values = np.sin(np.asarray(times, dtype=float) * 12.9898e-3 + seed * 78.233) * 43758.5453
+    return (values - np.floor(values)) * 2 - 1
+
+# Function to get an instrument's number for seeding its price path
+def instrument_seed(instrument):
+    return int(hashlib.sha1(instrument.encode()).hexdigest()[:8], 16) % 1000
+
+# Function to get an instrument's synthetic mid price at each time
+def mid_prices(instrument, base, times):
+    """A few slow waves around the fixture price plus noise. The price at a time never
+    depends on which request asked for it, so every granularity and page agrees."""
+    seed = instrument_seed(instrument)
+    days = np.asarray(times, dtype=float) / 86400
+    return base * (1 + 0.04 * np.sin(2 * math.pi * days / 97 + seed)
+                   + 0.015 * np.sin(2 * math.pi * days / 11.3 + 2 * seed)
+                   + 0.0015 * np.sin(2 * math.pi * days / 0.61 + 3 * seed)
+                   + 0.0008 * noise(times, seed))
+
+# Function to work out which candle start times a candles request covers
+def candle_times(granularity, params, now):
+    """Follows OANDA's rules for from, to, count and includeFirst. Returns an array of
+    start times, or raises ValueError with OANDA's error message."""
+    step = GRANULARITY_SECONDS[granularity]
+    offset = DAILY_ALIGNMENT % step
+    start, end = parse_time(params.get("from")), parse_time(params.get("to"))
+    if "count" in params and start is not None and end is not None:
+        raise ValueError("'count' cannot be specified when 'to' and 'from' parameters are set")
+    count = int(params.get("count", DEFAULT_CANDLES))
+    if not 0 < count <= MAX_CANDLES:
+        raise ValueError("Maximum value for 'count' exceeded")
+
+    # Enough grid points to cover `count` open candles across weekends
+    span = int(count * 7 / 5) + WEEK // step + 2
+    if start is not None:
+        first = math.ceil((start - offset) / step) * step + offset
+        if first == start and params.get("includeFirst", "true") == "false":
+            first += step
+        if end is not None:
+            span = int((end - first) // step) + 1
+            if span > 2 * MAX_CANDLES:
+                raise ValueError("Maximum value for 'count' exceeded")
+        times = first + step * np.arange(max(span, 0), dtype=float)
+    else:
+        last = math.floor(((now if end is None else end) - offset) / step) * step + offset
+        times = last - step * np.arange(span, dtype=float)[::-1]
+
+    times = times[market_open(times) & (times <= now)]
+    if end is not None:
+        times = times[times <= end]
+    if start is not None and end is None:
+        return times[:count]
+    if start is None:
+        return times[-count:]
+    if len(times) > MAX_CANDLES:
+        raise ValueError("Maximum value for 'count' exceeded")
+    return times
+
+# Function to parse a from/to value given as RFC 3339 or UNIX seconds
+def parse_time(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00").replace(" ", "+")).timestamp()
+
+# Function to format a time the way OANDA does for the datetimeFormat asked for
+def format_time(seconds, datetime_format="RFC3339"):
+    if datetime_format == "UNIX":
+        return f"{seconds:.9f}"
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+
+
+class TokenBucket:
+    """Allows `rate` requests per second; take() says how long to wait when none are left."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        return 0
+
+
+class MockAccount:
+    """State of the mock account: the fixtures plus every trade closed since they were loaded.
+
+    Open trades, the balance and the transaction history change when trades or positions
+    are closed, so polling /changes and following the transaction stream see the closes.
+    Sent Telegram messages are kept too.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.condition = threading.Condition()
+        self.reset()
+
+    def _fixture(self, name):
+        with open(os.path.join(self.fixtures_dir, name), "r") as f:
+            return json.load(f)
+
+    # Function to go back to the state recorded in the fixtures
+    def reset(self):
+        with self.condition:
+            self.summary = self._fixture("summary.json")["account"]
+            self.trades = self._fixture("openTrades.json")["trades"]
+            self.instruments = {i["name"]: i for i in self._fixture("instruments.json")["instruments"]}
+            market = self._fixture("market.json")
+            self.market = {name: (float(quote["price"]), float(quote["spread"]))
+                           for name, quote in market["instruments"].items()}
+            # Instruments without a recorded price get one scaled to their pip size (1.0 for a -4 pip)
+            for name, instrument in self.instruments.items():
+                if name not in self.market:
+                    pip = 10.0 ** instrument["pipLocation"]
+                    self.market[name] = (pip * 10000, pip * 1.5)
+            self.conversions = {currency: float(rate) for currency, rate in market["homeConversions"].items()}
+            self.last_transaction_id = int(self.summary["lastTransactionID"])
+            self.transactions = []
+            self.messages = []
+            self.condition.notify_all()
+
+    def precision(self, instrument):
+        return self.instruments.get(instrument, {}).get("displayPrecision", 5)
+
+    # Function to get the (bid, ask) of instruments at a time
+    def quotes(self, instruments, now):
+        quotes = {}
+        for instrument in instruments:
+            base, spread = self.market[instrument]
+            mid = float(mid_prices(instrument, base, [now])[0])
+            quotes[instrument] = (mid - spread / 2, mid + spread / 2)
+        return quotes
+
+    # Function to get the rate turning a currency into the account currency
+    def conversion(self, currency):
+        return self.conversions.get(currency, 1.0)
+
+    def _unrealized_pl(self, trade, quotes):
+        bid, ask = quotes[trade["instrument"]]
+        units = float(trade["currentUnits"])
+        exit_price = bid if units > 0 else ask
+        return (exit_price - float(trade["price"])) * units * self.conversion(trade["instrument"].rsplit("_", 1)[-1])
+
+    # Function to get the account summary with the open trades marked to the current prices
+    def account_summary(self, account_id, now):
+        with self.condition:
+            quotes = self.quotes({trade["instrument"] for trade in self.trades}, now)
+            unrealized = sum(self._unrealized_pl(trade, quotes) for trade in self.trades)
+            balance = float(self.summary["balance"])
+            account = dict(self.summary, id=account_id, unrealizedPL=f"{unrealized:.4f}",
+                           NAV=f"{balance + unrealized:.4f}", openTradeCount=len(self.trades),
+                           openPositionCount=len({trade["instrument"] for trade in self.trades}),
+                           lastTransactionID=str(self.last_transaction_id))
+            return {"account": account, "lastTransactionID": str(self.last_transaction_id)}
+
+    def open_trades(self, now):
+        with self.condition:
+            quotes = self.quotes({trade["instrument"] for trade in self.trades}, now)
+            trades = [dict(trade, unrealizedPL=f"{self._unrealized_pl(trade, quotes):.4f}") for trade in self.trades]
+            return {"trades": trades, "lastTransactionID": str(self.last_transaction_id)}
+
+    def changes(self, since):
+        with self.condition:
+            transactions = [t for t in self.transactions if int(t["id"]) > since]
+            return {
+                "changes": {"transactions": transactions, "tradesClosed": [], "tradesOpened": [], "tradesReduced": [],
+                            "ordersCreated": [], "ordersFilled": [], "ordersCancelled": [], "positions": []},
+                "state": {"NAV": self.summary["NAV"], "unrealizedPL": self.summary["unrealizedPL"]},
+                "lastTransactionID": str(self.last_transaction_id),
+            }
+
+    # Function to get current prices, and the home conversions OANDA adds on request
+    def pricing(self, instruments, now, include_home_conversions=False):
+        quotes = self.quotes(instruments, now)
+        prices = [self.price_message(instrument, quotes[instrument], now) for instrument in instruments]
+        data = {"prices": prices, "time": format_time(now)}
+        if include_home_conversions:
+            currencies = sorted({currency for instrument in instruments for currency in instrument.split("_")}
+                                & set(self.conversions))
+            # Losses convert at a slightly worse rate than gains, as on a real account
+            data["homeConversions"] = [
+                {"currency": currency, "accountGain": f"{self.conversion(currency) * 0.9995:.8g}",
+                 "accountLoss": f"{self.conversion(currency) * 1.0005:.8g}",
+                 "positionValue": f"{self.conversion(currency):.8g}"}
+                for currency in currencies
+            ]
+        return data
+
+    def price_message(self, instrument, quote, now):
+        bid, ask = quote
+        precision = self.precision(instrument)
+        factor = self.conversion(instrument.rsplit("_", 1)[-1])
+        return {
+            "type": "PRICE", "instrument": instrument, "time": format_time(now), "tradeable": True,
+            "bids": [{"price": f"{bid:.{precision}f}", "liquidity": 1000000}],
+            "asks": [{"price": f"{ask:.{precision}f}", "liquidity": 1000000}],
+            "closeoutBid": f"{bid:.{precision}f}", "closeoutAsk": f"{ask:.{precision}f}",
+            "quoteHomeConversionFactors": {"positiveUnits": f"{factor * 0.9995:.8g}",
+                                           "negativeUnits": f"{factor * 1.0005:.8g}"},
+        }
+
+    # Function to close trades at the current price and record one ORDER_FILL for them
+    def _fill(self, instrument, trades, reason, now):
+        bid, ask = self.quotes([instrument], now)[instrument]
+        units = sum(float(trade["currentUnits"]) for trade in trades)
+        price = bid if units > 0 else ask
+        quote_rate = self.conversion(instrument.rsplit("_", 1)[-1])
+        closed = []
+        for trade in trades:
+            pl = (price - float(trade["price"])) * float(trade["currentUnits"]) * quote_rate
+            closed.append({"tradeID": trade["id"], "units": str(-float(trade["currentUnits"])),
+                           "price": f"{price:.{self.precision(instrument)}f}", "realizedPL": f"{pl:.4f}"})
+            self.trades.remove(trade)
+        pl = sum(float(trade_closed["realizedPL"]) for trade_closed in closed)
+        balance = float(self.summary["balance"]) + pl
+        self.summary["balance"] = f"{balance:.4f}"
+        self.last_transaction_id += 1
+        fill = {
+            "id": str(self.last_transaction_id), "time": format_time(now), "type": "ORDER_FILL",
+            "instrument": instrument, "units": str(-units), "price": f"{price:.{self.precision(instrument)}f}",
+            "pl": f"{pl:.4f}", "financing": "0.0000", "accountBalance": f"{balance:.4f}", "reason": reason,
+            "tradesClosed": closed,
+        }
+        self.transactions.append(fill)
+        self.condition.notify_all()
+        return fill
+
+    # Function to close one trade; returns (status, body)
+    def close_trade(self, trade_id, now):
+        with self.condition:
+            trade = next((trade for trade in self.trades if trade["id"] == trade_id), None)
+            if trade is None:
+                return 404, {"errorCode": "NO_SUCH_TRADE", "errorMessage": "The Trade specified does not exist",
+                             "lastTransactionID": str(self.last_transaction_id)}
+            fill = self._fill(trade["instrument"], [trade], "MARKET_ORDER_TRADE_CLOSE", now)
+            return 200, {"orderFillTransaction": fill, "relatedTransactionIDs": [fill["id"]],
+                         "lastTransactionID": str(self.last_transaction_id)}
+
+    # Function to close the long and/or short side of a position; returns (status, body)
+    def close_position(self, instrument, long_units, short_units, now):
+        with self.condition:
+            sides = [("long", long_units, lambda units: units > 0), ("short", short_units, lambda units: units < 0)]
+            body = {}
+            for side, side_units, on_side in sides:
+                if side_units in (None, "NONE"):
+                    continue
+                trades = [trade for trade in self.trades
+                          if trade["instrument"] == instrument and on_side(float(trade["currentUnits"]))]
+                if not trades:
+                    return 400, {"errorCode": "CLOSEOUT_POSITION_DOESNT_EXIST",
+                                 "errorMessage": "The Position requested to be closed out does not exist",
+                                 "lastTransactionID": str(self.last_transaction_id)}
+                body[f"{side}OrderFillTransaction"] = self._fill(instrument, trades, "MARKET_ORDER_POSITION_CLOSEOUT", now)
+            if not body:
+                return 400, {"errorMessage": "Neither longUnits nor shortUnits were specified"}
+            body["relatedTransactionIDs"] = [fill["id"] for fill in body.values()]
+            body["lastTransactionID"] = str(self.last_transaction_id)
+            return 200, body
+
+    def send_message(self, chat_id, text):
+        with self.condition:
+            message = {"message_id": len(self.messages) + 1, "chat": {"id": chat_id}, "date": int(time.time()),
+                       "text": text}
+            self.messages.append(message)
+            return message
+
+    # Function to render candles in the shape of OANDA's candles endpoint
+    def candles(self, instrument, params, now):
+        granularity = params.get("granularity", "S5")
+        if instrument not in self.market:
+            raise ValueError("Invalid value specified for 'instrument'")
+        if granularity not in GRANULARITY_SECONDS:
+            raise ValueError("Invalid value specified for 'granularity'")
+        times = candle_times(granularity, params, now)
+        step = GRANULARITY_SECONDS[granularity]
+        base, spread = self.market[instrument]
+        seed = instrument_seed(instrument)
+
+        opens = mid_prices(instrument, base, times)
+        closes = mid_prices(instrument, base, np.minimum(times + step, now))
+        wicks = base * 0.0004 * math.sqrt(step / 3600)
+        highs = np.maximum(opens, closes) + wicks * np.abs(noise(times, seed + 1))
+        lows = np.minimum(opens, closes) - wicks * np.abs(noise(times, seed + 2))
+        volumes = 100 + (500 * np.abs(noise(times, seed + 3))).astype(int)
+        prices = np.column_stack([opens, highs, lows, closes])
+
+        precision = self.precision(instrument)
+        datetime_format = params.get("datetimeFormat", "RFC3339")
+        offsets = {"M": 0, "B": -spread / 2, "A": spread / 2}
+        names = {"M": "mid", "B": "bid", "A": "ask"}
+        candles = []
+        for row, start in enumerate(times):
+            candle = {"complete": bool(start + step <= now), "volume": int(volumes[row]),
+                      "time": format_time(start, datetime_format)}
+            for letter in params.get("price", "M"):
+                values = prices[row] + offsets[letter]
+                candle[names[letter]] = {key: f"{value:.{precision}f}" for key, value in zip("ohlc", values)}
+            candles.append(candle)
+        return {"instrument": instrument, "granularity": granularity, "candles": candles}
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server answering as OANDA's v20 REST and streaming APIs and Telegram's Bot API.
+
+    Every request waits `latency` seconds (plus up to `jitter`), may be refused with a 429
+    once a token's `rate_limit` requests per second are used up (Telegram: `telegram_rate_limit`
+    messages per second per chat), and fails with one of `error_statuses` with probability
+    `error_rate`. The random choices come from one generator seeded with `seed`, so a run
+    can be repeated. With `recordings` set, recorded responses are replayed before any
+    synthetic one; with `upstream` set as well, GET requests without a recording are sent
+    there and recorded.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, fixtures_dir=FIXTURES_DIR, latency=0.0, jitter=0.0, rate_limit=0,
+                 telegram_rate_limit=0, error_rate=0.0, error_statuses=(500, 503), seed=0, heartbeat=5.0,
+                 price_interval=1.0, recordings=None, upstream=None):
+        super().__init__(address, MockHandler)
+        self.account = MockAccount(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.telegram_rate_limit = telegram_rate_limit
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.heartbeat = heartbeat
+        self.price_interval = price_interval
+        self.recordings = recordings
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.stats = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def delay(self):
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    # Function to take a request from a client's allowance; returns the seconds to wait when refused
+    def throttle(self, client, rate):
+        if not rate:
+            return 0
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(rate)
+            return bucket.take()
+
+    # Function to decide whether this request fails; returns the status to fail with, or None
+    def injected_error(self):
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses)
+        return None
+
+    # Function to find the recording file of a request
+    def recording_path(self, method, path, query):
+        key = f"{method} {path}?{'&'.join(f'{k}={v}' for k, v in sorted(query.items()))}"
+        name = re.sub(r"[^A-Za-z0-9_]+", "_", path.rstrip("/").rsplit("/", 1)[-1])
+        return os.path.join(self.recordings, f"{method.lower()}_{name}_{hashlib.sha1(key.encode()).hexdigest()[:16]}.json")
+
+    def load_recording(self, method, path, query):
+        if not self.recordings:
+            return None
+        recording_path = self.recording_path(method, path, query)
+        if not os.path.exists(recording_path):
+            return None
+        with open(recording_path, "r") as f:
+            recording = json.load(f)
+        return recording["status"], recording["body"]
+
+    def save_recording(self, method, path, query, status, body):
+        os.makedirs(self.recordings, exist_ok=True)
+        with open(self.recording_path(method, path, query), "w") as f:
+            json.dump({"method": method, "path": path, "query": query, "status": status, "body": body}, f, indent=2)
+
+    # Function to send a request on to the upstream server; returns (status, body)
+    def forward(self, method, path_and_query, headers):
+        request = urllib.request.Request(self.upstream + path_and_query, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        try:
+            return status, json.loads(payload)
+        except ValueError:
+            return status, payload.decode("utf-8", "replace")
+
+
+# (method, path pattern, handler method name) for each endpoint served
+ROUTES = [
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/summary", "account_summary"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/instruments", "instruments"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/changes", "changes"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/pricing", "pricing"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/(?:openTrades|trades)", "open_trades"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/pricing/stream", "pricing_stream"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/transactions/stream", "transaction_stream"),
+    ("GET", r"/v3/instruments/(?P<instrument>[^/]+)/candles", "candles"),
+    ("GET", r"/v3/accounts/(?P<account_id>[^/]+)/instruments/(?P<instrument>[^/]+)/candles", "candles"),
+    ("PUT", r"/v3/accounts/(?P<account_id>[^/]+)/trades/(?P<trade_id>[^/]+)/close", "close_trade"),
+    ("PUT", r"/v3/accounts/(?P<account_id>[^/]+)/positions/(?P<instrument>[^/]+)/close", "close_position"),
+    ("POST", r"/bot(?P<token>[^/]+)/sendMessage", "send_message"),
+    ("GET", r"/mock/state", "state"),
+    ("POST", r"/mock/reset", "reset"),
+]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so pooled clients behave as they do against OANDA
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=()):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Function to read a JSON or form-encoded request body (Telegram clients send either)
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length).decode("utf-8") if length else ""
+        if not payload:
+            return {}
+        if "json" in self.headers.get("Content-Type", ""):
+            return json.loads(payload) or {}
+        return {key: values[-1] for key, values in parse_qs(payload).items()}
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.read_body()
+        for route_method, pattern, name in ROUTES:
+            match = re.fullmatch(pattern, url.path)
+            if match and route_method == method:
+                break
+        else:
+            self.send_json(404, {"errorMessage": f"{method} {url.path} is not served by the mock server"})
+            return
+
+        server = self.server
+        if name in ("state", "reset"):  # Control endpoints skip latency, limits and errors
+            getattr(self, name)()
+            return
+        server.count(name)
+        telegram = name == "send_message"
+
+        time.sleep(server.delay())
+        client = body.get("chat_id", "") if telegram else self.headers.get("Authorization", "")
+        wait = server.throttle((telegram, client), server.telegram_rate_limit if telegram else server.rate_limit)
+        if wait:
+            server.count("rate_limited")
+            retry_after = max(1, math.ceil(wait))
+            if telegram:
+                self.send_json(429, {"ok": False, "error_code": 429,
+                                     "description": f"Too Many Requests: retry after {retry_after}",
+                                     "parameters": {"retry_after": retry_after}})
+            else:
+                self.send_json(429, {"errorMessage": "Requests are being rate limited"},
+                               [("Retry-After", str(retry_after))])
+            return
+        status = server.injected_error()
+        if status:
+            server.count("injected_errors")
+            self.send_json(status, {"ok": False, "error_code": status, "description": "Injected error"} if telegram
+                           else {"errorMessage": "Injected error"})
+            return
+        if not telegram and not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_json(401, {"errorMessage": "Insufficient authorization to perform request."})
+            return
+
+        streaming = name.endswith("_stream")
+        recorded = None if streaming else server.load_recording(method, url.path, query)
+        if recorded is None and server.upstream and method == "GET" and not streaming:
+            headers = {name: self.headers[name] for name in ("Authorization", "Accept-Datetime-Format") if name in self.headers}
+            recorded = server.forward(method, self.path, headers)
+            server.save_recording(method, url.path, query, *recorded)
+        if recorded is not None:
+            self.send_json(*recorded)
+            return
+        getattr(self, name)(query=query, body=body, **match.groupdict())
+
+    def account_summary(self, account_id, query, body):
+        self.send_json(200, self.server.account.account_summary(account_id, time.time()))
+
+    def instruments(self, account_id, query, body):
+        instruments = list(self.server.account.instruments.values())
+        if "instruments" in query:
+            wanted = query["instruments"].split(",")
+            instruments = [i for i in instruments if i["name"] in wanted]
+        self.send_json(200, {"instruments": instruments,
+                             "lastTransactionID": str(self.server.account.last_transaction_id)})
+
+    def changes(self, account_id, query, body):
+        if "sinceTransactionID" not in query:
+            self.send_json(400, {"errorMessage": "Missing required parameter 'sinceTransactionID'"})
+            return
+        self.send_json(200, self.server.account.changes(int(query["sinceTransactionID"])))
+
+    def pricing(self, account_id, query, body):
+        instruments = [i for i in query.get("instruments", "").split(",") if i]
+        unknown = [i for i in instruments if i not in self.server.account.market]
+        if not instruments or unknown:
+            self.send_json(400, {"errorMessage": "Invalid value specified for 'instruments'"})
+            return
+        self.send_json(200, self.server.account.pricing(instruments, time.time(),
+                                                        query.get("includeHomeConversions") == "true"))
+
+    def open_trades(self, account_id, query, body):
+        self.send_json(200, self.server.account.open_trades(time.time()))
+
+    def candles(self, instrument, query, body, account_id=None):
+        try:
+            self.send_json(200, self.server.account.candles(instrument, query, time.time()))
+        except ValueError as e:
+            self.send_json(400, {"errorMessage": str(e)})
+
+    def close_trade(self, account_id, trade_id, query, body):
+        self.send_json(*self.server.account.close_trade(trade_id, time.time()))
+
+    def close_position(self, account_id, instrument, query, body):
+        self.send_json(*self.server.account.close_position(instrument, body.get("longUnits"), body.get("shortUnits"),
+                                                           time.time()))
+
+    def send_message(self, token, query, body):
+        chat_id, text = body.get("chat_id") or query.get("chat_id"), body.get("text") or query.get("text")
+        if not chat_id or not text:
+            self.send_json(400, {"ok": False, "error_code": 400, "description": "Bad Request: message text is empty"})
+            return
+        self.send_json(200, {"ok": True, "result": self.server.account.send_message(chat_id, text)})
+
+    # Function to stream newline-delimited JSON with chunked encoding, as OANDA's stream API does
+    def start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_line(self, message):
+        line = (json.dumps(message) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def heartbeat(self, now):
+        return {"type": "HEARTBEAT", "lastTransactionID": str(self.server.account.last_transaction_id),
+                "time": format_time(now)}
+
+    def transaction_stream(self, account_id, query, body):
+        account = self.server.account
+        self.start_stream()
+        with account.condition:
+            sent = len(account.transactions)
+        try:
+            while True:
+                with account.condition:
+                    account.condition.wait_for(lambda: len(account.transactions) > sent, self.server.heartbeat)
+                    new = account.transactions[sent:]
+                    sent = len(account.transactions)
+                for transaction in new:
+                    self.write_line(transaction)
+                if not new:
+                    self.write_line(self.heartbeat(time.time()))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def pricing_stream(self, account_id, query, body):
+        account = self.server.account
+        instruments = [i for i in query.get("instruments", "").split(",") if i in account.market]
+        if not instruments:
+            self.send_json(400, {"errorMessage": "Invalid value specified for 'instruments'"})
+            return
+        self.start_stream()
+        last_heartbeat = time.monotonic()
+        try:
+            while True:
+                now = time.time()
+                for instrument, quote in account.quotes(instruments, now).items():
+                    self.write_line(account.price_message(instrument, quote, now))
+                if time.monotonic() - last_heartbeat >= self.server.heartbeat:
+                    self.write_line(self.heartbeat(now))
+                    last_heartbeat = time.monotonic()
+                time.sleep(self.server.price_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    # Function to report request counts, transactions and Telegram messages, for checking a test run
+    def state(self):
+        server = self.server
+        with server.account.condition:
+            body = {"requests": dict(server.stats), "transactions": list(server.account.transactions),
+                    "telegram": list(server.account.messages), "openTrades": copy.deepcopy(server.account.trades)}
+        self.send_json(200, body)
+
+    def reset(self):
+        self.server.account.reset()
+        with self.server._lock:
+            self.server.stats.clear()
+            self.server._buckets.clear()
+        self.send_json(200, {"reset": True})
+
+
+# Function to parse the command line and serve until interrupted
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m daytrading.mock_server",
+                                     description="Local stand-in for the OANDA v20 and Telegram Bot APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory with the account fixtures")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many random milliseconds more")
+    parser.add_argument("--rate-limit", type=float, default=0, help="OANDA requests per second per API key (0: no limit)")
+    parser.add_argument("--telegram-rate-limit", type=float, default=0, help="Telegram messages per second per chat (0: no limit)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests that fail")
+    parser.add_argument("--error-statuses", nargs="+", type=int, default=[500, 503])
+    parser.add_argument("--seed", type=int, default=0, help="seed for jitter and error injection")
+    parser.add_argument("--heartbeat", type=float, default=5, help="seconds between stream heartbeats")
+    parser.add_argument("--price-interval", type=float, default=1, help="seconds between pricing stream updates")
+    parser.add_argument("--recordings", help="directory of recorded responses to replay")
+    parser.add_argument("--record", metavar="UPSTREAM_URL",
+                        help="send GET requests without a recording to this server and record them (needs --recordings)")
+    args = parser.parse_args(argv)
+    if args.record and not args.recordings:
+        parser.error("--record needs --recordings")
+
+    server = MockServer((args.host, args.port), args.fixtures, args.latency / 1000, args.jitter / 1000,
+                        args.rate_limit, args.telegram_rate_limit, args.error_rate, args.error_statuses, args.seed,
+                        args.heartbeat, args.price_interval, args.recordings, args.record)
+    print(f"Mock OANDA/Telegram server on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import threading
+import time
+
+PRACTICE_URL = "https://api-fxpractice.oanda.com"
+LIVE_URL = "https://api-fxtrade.oanda.com"
+# Local stand-in started with python -m daytrading.mock_server
+MOCK_URL = "http://127.0.0.1:8765"
+ENVIRONMENTS = {"demo": PRACTICE_URL, "live": LIVE_URL, "mock": MOCK_URL}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class RateLimiter:
+    """Token bucket that spaces requests out to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._tokens = rate
+        self._updated = time.monotonic()
+
+    # Function to block until a request may be sent
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class OandaClient:
+    """OANDA v20 REST client that keeps one pooled keep-alive session per API key.
+
+    GET requests time out after `timeout` seconds and are retried with exponential
+    backoff on 429 and 5xx responses, honouring any Retry-After header. Requests are
+    also throttled to `rate_limit` per second, below OANDA's documented REST limit.
+    """
+
+    def __init__(self, api_key, base_url, timeout=10, retries=3, backoff_factor=0.5, pool_size=10, rate_limit=50):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit)
+
+        # Imported here so the compute layer loads without pulling in requests
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,  # Hand the last response back so the caller reports it
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # Function to GET an API path and return the decoded JSON body
+    def get(self, path, params=None):
+        self.rate_limiter.acquire()
+        response = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"API request error: {response.status_code} - {response.text}")
+        return response.json()
+
+
+# Function to get the shared client for an API key and host
+def get_client(api_key, base_url):
+    with _clients_lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            client = _clients[(api_key, base_url)] = OandaClient(api_key, base_url)
+        return client
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+
+# units: units to trade, in the instrument's unit precision; risk_amount and pip_value are in the account currency
+PositionSize = namedtuple("PositionSize", "instrument units risk_amount stop_pips pip_value")
+
+
+# Function to get the currency an instrument is priced in (EUR_USD -> USD, DE30_EUR -> EUR)
+def quote_currency(instrument):
+    return instrument.rsplit("_", 1)[-1]
+
+
+class ConversionRates:
+    """Rates that turn an amount in a quote currency into the account currency.
+
+    Rates come from OANDA's pricing endpoint with includeHomeConversions, which answers
+    for every currency of the instruments asked for in a single call. Each rate is kept
+    for `ttl` seconds, so repeated sizing only goes to the network for stale currencies.
+    """
+
+    def __init__(self, get, account_id, ttl=60):
+        self.get = get
+        self.account_id = account_id
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._home_currency = None
+        self._rates = {}
+
+    # Function to get the account currency, read once from the account summary
+    def home_currency(self):
+        with self._lock:
+            if self._home_currency is None:
+                data = self.get(f"/v3/accounts/{self.account_id}/summary")
+                self._home_currency = data["account"]["currency"]
+            return self._home_currency
+
+    # Function to get the conversion rate for each instrument's quote currency
+    def rates(self, instruments):
+        home_currency = self.home_currency()
+        with self._lock:
+            now = time.time()
+            stale = sorted({
+                instrument for instrument in instruments
+                if quote_currency(instrument) != home_currency
+                and now - self._rates.get(quote_currency(instrument), (None, 0))[1] > self.ttl
+            })
+            if stale:
+                data = self.get(f"/v3/accounts/{self.account_id}/pricing",
+                                params={"instruments": ",".join(stale), "includeHomeConversions": "true"})
+                # accountLoss is the factor OANDA uses for losses, which is what a stop risks
+                for conversion in data.get("homeConversions", []):
+                    self._rates[conversion["currency"]] = (float(conversion["accountLoss"]), now)
+
+            rates = {}
+            for instrument in instruments:
+                currency = quote_currency(instrument)
+                if currency == home_currency:
+                    rates[instrument] = 1.0
+                elif currency in self._rates:
+                    rates[instrument] = self._rates[currency][0]
+                else:
+                    raise Exception(f"No {currency} to {home_currency} conversion rate available.")
+            return rates
+
+
+# Function to size many positions at once from the NAV and a risk percentage
+def calculate_position_sizes(nav, risk_percent, trades, rates, pip_location, unit_precision=None):
+    """Returns a PositionSize for each (instrument, entry, stop) in trades.
+
+    rates is a ConversionRates; every instrument's rate comes from one rates() call.
+    pip_location(instrument) gives the pip exponent, e.g. InstrumentCatalog.pip_location,
+    and unit_precision(instrument) the decimals of units it trades in, e.g.
+    InstrumentCatalog.unit_precision (whole units when not given). Units are rounded
+    down to that precision so the loss at the stop never exceeds the risk amount.
+    """
+    if not trades:
+        return []
+    instruments = [instrument for instrument, _, _ in trades]
+    entries = np.array([entry for _, entry, _ in trades], dtype=float)
+    stops = np.array([stop for _, _, stop in trades], dtype=float)
+    distances = np.abs(entries - stops)
+    if not distances.all():
+        same = [instrument for instrument, distance in zip(instruments, distances) if distance == 0]
+        raise ValueError(f"Entry and stop are the same for {', '.join(same)}.")
+
+    conversion = rates.rates(instruments)
+    conversion = np.array([conversion[instrument] for instrument in instruments])
+    pip_sizes = 10.0 ** np.array([pip_location(instrument) for instrument in instruments])
+    precisions = [unit_precision(instrument) if unit_precision else 0 for instrument in instruments]
+    unit_steps = 10.0 ** np.array(precisions)
+
+    risk_amount = float(nav) * risk_percent / 100
+    units = np.floor(risk_amount / (distances * conversion) * unit_steps) / unit_steps
+    stop_pips = distances / pip_sizes
+    pip_values = units * pip_sizes * conversion
+    return [
+        PositionSize(instrument, round(float(units[i]), precisions[i]) if precisions[i] else int(units[i]),
+                     risk_amount, float(stop_pips[i]), float(pip_values[i]))
+        for i, instrument in enumerate(instruments)
+    ]
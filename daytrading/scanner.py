@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .fetch_executor import FetchCancelled
+
+SCAN_COLUMNS = ["Instrument", "Previous Close", "Level Above", "Above", "% to Above", "Level Below", "Below", "% to Below"]
+
+
+# Function to build key-level indexes for many instruments with bounded concurrency
+def scan_instruments(cancelled, instruments, build_index, max_workers=8):
+    """Calls build_index(instrument) for every instrument on a pool of max_workers threads.
+
+    Returns ({instrument: index}, {instrument: error}); one failing instrument does not
+    stop the scan. Raises FetchCancelled if cancelled is set while waiting.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+    try:
+        futures = {pool.submit(build_index, instrument): instrument for instrument in instruments}
+        pending = set(futures)
+        while pending:
+            if cancelled.is_set():
+                raise FetchCancelled()
+            _, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    indexes, errors = {}, {}
+    for future, instrument in futures.items():
+        try:
+            indexes[instrument] = future.result()
+        except Exception as e:
+            errors[instrument] = e
+    return indexes, errors
+
+# Function to get the nearest key level on one side of the previous close
+def nearest_level(levels, close):
+    for name, price in levels:
+        if name != "Close of previous day":
+            return name, price, abs(price - close) / close * 100
+    return "", None, None
+
+# Function to turn a key-level index into one scanner table row
+def scan_row(index):
+    # Levels above are measured on the bid side and levels below on the ask side
+    close = index.levels["Close of previous day"]
+    ask_close = index.ask_levels["Close of previous day"]
+    above_name, above, above_pct = nearest_level(index.above(close), close)
+    below_name, below, below_pct = nearest_level(index.below(ask_close), ask_close)
+    return [
+        index.instrument,
+        close,
+        above_name,
+        "" if above is None else above,
+        "" if above_pct is None else f"{above_pct:.2f}",
+        below_name,
+        "" if below is None else below,
+        "" if below_pct is None else f"{below_pct:.2f}",
+    ]
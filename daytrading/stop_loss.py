@@ -0,0 +1,48 @@
+import numpy as np
+
+# Default stop-loss ladder, as percentages of the swing price
+DEFAULT_PERCENTAGES = (0.03, 0.3, 3)
+
+
+# Function to turn LONG/SHORT directions into -1/+1 multipliers
+def direction_signs(directions, count):
+    """Returns a float array of -1 (LONG) or +1 (SHORT), one per swing price.
+
+    directions is either a single "LONG"/"SHORT" applied to every row, or one per row.
+    """
+    directions = np.asarray(directions)
+    if directions.ndim == 0:
+        directions = np.full(count, directions.item())
+    invalid = ~np.isin(directions, ("LONG", "SHORT"))
+    if invalid.any():
+        raise ValueError(f"Invalid direction(s): {', '.join(sorted(set(directions[invalid])))}")
+    return np.where(directions == "LONG", -1.0, 1.0)
+
+# Function to calculate a stop-loss matrix for many swing prices at once
+def calculate_stop_loss_matrix(swing_prices, directions, percentages=DEFAULT_PERCENTAGES):
+    """Returns an array of shape (len(swing_prices), len(percentages)).
+
+    Row i, column j is swing_prices[i] moved percentages[j] percent away from the
+    trade: below it for LONG, above it for SHORT.
+    """
+    swings = np.asarray(swing_prices, dtype=float).reshape(-1)
+    signs = direction_signs(directions, len(swings))
+    offsets = np.asarray(percentages, dtype=float) / 100
+    return swings[:, None] * (1 + signs[:, None] * offsets[None, :])
+
+# Function to calculate ATR-based stops for many swing prices at once
+def calculate_atr_stop_matrix(swing_prices, directions, atrs, multiples):
+    """Returns an array of shape (len(swing_prices), len(multiples)).
+
+    Row i, column j is swing_prices[i] moved multiples[j] times atrs[i] away from the
+    trade. atrs may also be a single value shared by every row.
+    """
+    swings = np.asarray(swing_prices, dtype=float).reshape(-1)
+    signs = direction_signs(directions, len(swings))
+    atrs = np.broadcast_to(np.asarray(atrs, dtype=float), swings.shape)
+    return swings[:, None] + (signs * atrs)[:, None] * np.asarray(multiples, dtype=float)[None, :]
+
+# Function to calculate stop losses for a single swing price
+def calculate_stop_losses(swing_price, direction, percentages=DEFAULT_PERCENTAGES):
+    stop_losses = calculate_stop_loss_matrix([swing_price], direction, percentages)[0]
+    return {f"{percentage}%": float(value) for percentage, value in zip(percentages, stop_losses)}
@@ -0,0 +1,95 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .backtest import intraday_matrix, key_level_matrix, load_history, simulate, summarize
+from .candle_store import CandleStore
+
+# Which sessions a direction is traded on, judged from the previous session's candle
+DIRECTION_FILTERS = ["all", "with-trend", "against-trend"]
+
+# Columns of a sweep results file, one row per (instrument, direction, filter, stop, target)
+SWEEP_COLUMNS = ["instrument", "direction", "filter", "stop_percent", "target",
+                 "trades", "hit_rate", "average_r", "total_r", "max_drawdown"]
+
+
+# Function to pick the sessions a direction filter lets a trade through on
+def filter_mask(daily, sessions, direction, direction_filter):
+    if direction_filter == "all":
+        return np.ones(len(sessions), dtype=bool)
+    # The previous session closed up (for LONG) or down (for SHORT)
+    previous = sessions - 1
+    with_trend = (daily.close[previous] > daily.open[previous]) == (direction == "LONG")
+    return with_trend if direction_filter == "with-trend" else ~with_trend
+
+# Function to run every stop/target/filter combination for one instrument and direction (runs in a worker process)
+def sweep_instrument(instrument, direction, start_date, end_date, stop_percents, targets, filters,
+                     granularity="H1", db_path="candles.db"):
+    """Returns a list of rows in SWEEP_COLUMNS order.
+
+    The candles, key levels and intraday bars are loaded and laid out once, then reused
+    by every combination.
+    """
+    daily, intraday = load_history(CandleStore(db_path), instrument, start_date, end_date, granularity)
+    exits = daily.side("bid" if direction == "LONG" else "ask")
+    levels = key_level_matrix(exits)
+    bars = intraday_matrix(exits, intraday.side("bid" if direction == "LONG" else "ask"))
+
+    rows = []
+    for stop_percent, target in itertools.product(stop_percents, targets):
+        sessions, r_multiples, target_hit = simulate(daily, intraday, direction, stop_percent, target, levels, bars)
+        in_range = daily.time[sessions] >= start_date.timestamp()
+        for direction_filter in filters:
+            keep = in_range & filter_mask(daily, sessions, direction, direction_filter)
+            result = summarize(instrument, direction, r_multiples[keep], np.count_nonzero(target_hit[keep]))
+            rows.append([instrument, direction, direction_filter, stop_percent, target, result.trades,
+                         result.hit_rate, result.average_r, result.total_r, result.max_drawdown])
+    return rows
+
+# Function to sweep a grid of stop percentages, targets and direction filters across CPU cores
+def run_sweep(instruments, start_date, end_date, stop_percents, targets=(1,), filters=DIRECTION_FILTERS,
+              directions=("LONG", "SHORT"), granularity="H1", db_path="candles.db", max_workers=None):
+    """Each (instrument, direction) is one task for a ProcessPoolExecutor with one worker per
+    CPU by default. Returns the results as {column: array} in SWEEP_COLUMNS order."""
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(sweep_instrument, instrument, direction, start_date, end_date, list(stop_percents),
+                        list(targets), list(filters), granularity, db_path)
+            for instrument in instruments for direction in directions
+        ]
+        rows = [row for future in futures for row in future.result()]
+    columns = list(zip(*rows)) if rows else [[]] * len(SWEEP_COLUMNS)
+    return {
+        "instrument": np.array(columns[0], dtype=str),
+        "direction": np.array(columns[1], dtype=str),
+        "filter": np.array(columns[2], dtype=str),
+        "stop_percent": np.array(columns[3], dtype=float),
+        "target": np.array(columns[4], dtype=np.int16),
+        "trades": np.array(columns[5], dtype=np.int32),
+        "hit_rate": np.array(columns[6], dtype=np.float32),
+        "average_r": np.array(columns[7], dtype=np.float32),
+        "total_r": np.array(columns[8], dtype=np.float32),
+        "max_drawdown": np.array(columns[9], dtype=np.float32),
+    }
+
+# Function to write sweep results as a compressed columnar .npz file (one array per column)
+def save_sweep(results, path="sweep.npz"):
+    np.savez_compressed(path, **results)
+
+# Function to read a sweep results file back as {column: array}
+def load_sweep(path="sweep.npz"):
+    with np.load(path) as data:
+        return {column: data[column] for column in SWEEP_COLUMNS}
+
+# Function to total the sweep across instruments and rank the combinations by total R
+def rank_combinations(results, top=10):
+    """Returns [(direction, filter, stop_percent, target, trades, total_r), ...], best first."""
+    totals = {}
+    for direction, direction_filter, stop_percent, target, trades, total_r in zip(
+            results["direction"], results["filter"], results["stop_percent"], results["target"],
+            results["trades"], results["total_r"]):
+        key = (str(direction), str(direction_filter), float(stop_percent), int(target))
+        count, r = totals.get(key, (0, 0.0))
+        totals[key] = (count + int(trades), r + float(total_r))
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    return [key + value for key, value in ranked[:top]]
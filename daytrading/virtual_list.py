@@ -0,0 +1,79 @@
+import tkinter as tk
+
+
+class VirtualCheckList:
+    """Scrollable checklist that only has widgets for the rows on screen.
+
+    The ticked state of every item lives in the `checked` dict (item -> bool). A small
+    pool of Checkbuttons is moved and relabelled as the list scrolls, so opening the
+    list costs the same whether it holds ten items or ten thousand.
+    """
+
+    def __init__(self, parent, checked, row_height=24, width=250, height=400):
+        self.checked = checked
+        self.items = []
+        self.row_height = row_height
+        self.pool = []
+
+        self.scrollbar = tk.Scrollbar(parent)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas = tk.Canvas(parent, width=width, height=height, yscrollincrement=row_height,
+                                yscrollcommand=self._on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.config(command=self.canvas.yview)
+
+        self.canvas.bind("<Configure>", lambda event: self._resize_pool(event.height))
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+        self._resize_pool(height)
+
+    # Function to make sure there is one widget per visible row, plus one for partial rows
+    def _resize_pool(self, height):
+        needed = height // self.row_height + 2
+        while len(self.pool) < needed:
+            var = tk.BooleanVar()
+            button = tk.Checkbutton(self.canvas, variable=var, anchor="w")
+            row = {"var": var, "button": button, "item": None}
+            button.config(command=lambda row=row: self._on_toggle(row))
+            button.bind("<MouseWheel>", self._on_mousewheel)
+            button.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+            button.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+            row["window"] = self.canvas.create_window(0, 0, window=button, anchor="nw", state="hidden")
+            self.pool.append(row)
+        self.refresh()
+
+    def _on_toggle(self, row):
+        if row["item"] is not None:
+            self.checked[row["item"]] = row["var"].get()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    # Function to replace the items shown, e.g. after a search
+    def show(self, items):
+        self.items = items
+        self.canvas.config(scrollregion=(0, 0, 0, len(items) * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    # Function to bind the pool widgets to the rows currently in view
+    def refresh(self):
+        first = int(self.canvas.canvasy(0)) // self.row_height
+        for offset, row in enumerate(self.pool):
+            index = first + offset
+            if index < len(self.items):
+                item = self.items[index]
+                row["item"] = item
+                row["button"].config(text=item)
+                row["var"].set(self.checked.get(item, False))
+                self.canvas.coords(row["window"], 0, index * self.row_height)
+                self.canvas.itemconfigure(row["window"], state="normal")
+            else:
+                row["item"] = None
+                self.canvas.itemconfigure(row["window"], state="hidden")
@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import time
+import queue
+import json
+import atexit
+import argparse
+import threading
 import requests
 import oandapyV20
+from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
 from dotenv import load_dotenv
 # 1. ADDED: Import the datetime module for timestamps
 from datetime import datetime
 from oandapyV20.endpoints.accounts import AccountSummary
 from oandapyV20.endpoints.trades import OpenTrades, TradeClose
+from oandapyV20.endpoints.positions import PositionClose
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # --- Load Environment Variables ---
 load_dotenv() 
@@ -17,21 +27,136 @@ ACCOUNT_ID = os.getenv("OANDA_ACCOUNT_ID")
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 INSTRUMENT = os.getenv("OANDA_INSTRUMENT")
+# "trades" closes each trade concurrently; "position" closes the whole position in one request
+CLOSE_MODE = os.getenv("CLOSE_MODE", "trades")
+CLOSE_WORKERS = int(os.getenv("CLOSE_WORKERS", "8"))
+# Daemon mode: daily cutoffs ("HH:MM,HH:MM", local time) and optional P/L triggers in account currency
+CLOSE_AT = os.getenv("CLOSE_AT", "")
+CLOSE_ON_PROFIT = float(os.getenv("CLOSE_ON_PROFIT")) if os.getenv("CLOSE_ON_PROFIT") else None
+CLOSE_ON_LOSS = float(os.getenv("CLOSE_ON_LOSS")) if os.getenv("CLOSE_ON_LOSS") else None
+POLL_SECONDS = float(os.getenv("POLL_SECONDS", "5"))
+# Wait after a failed close before trying the same trades again; doubles with each failure up to the maximum
+CLOSE_RETRY_SECONDS = float(os.getenv("CLOSE_RETRY_SECONDS", "30"))
+CLOSE_RETRY_MAX_SECONDS = float(os.getenv("CLOSE_RETRY_MAX_SECONDS", "900"))
+STATUS_PORT = int(os.getenv("STATUS_PORT", "8080"))
+# /health shows the open trades and P/L, so it only listens locally unless STATUS_HOST says otherwise
+STATUS_HOST = os.getenv("STATUS_HOST", "127.0.0.1")
+# Which OANDA account the API key belongs to: "demo" (fxTrade Practice), "live", or "mock" for
+# the local mock server (python -m daytrading.mock_server) at OANDA_MOCK_URL
+OANDA_ENVIRONMENT = os.getenv("OANDA_ENVIRONMENT", "demo")
+OANDA_MOCK_URL = os.getenv("OANDA_MOCK_URL", "http://127.0.0.1:8765")
+if OANDA_ENVIRONMENT == "mock":
+    # oandapyV20 only talks to the hosts it knows, so register the mock server with it
+    TRADING_ENVIRONMENTS["mock"] = {"api": OANDA_MOCK_URL, "stream": OANDA_MOCK_URL}
+OANDA_API_ENVIRONMENT = {"demo": "practice", "live": "live", "mock": "mock"}[OANDA_ENVIRONMENT]
+# Streaming mode: OANDA_STREAM_URL follows the environment unless pointed at a local fake stream server
+STREAM_URLS = {"demo": "https://stream-fxpractice.oanda.com", "live": "https://stream-fxtrade.oanda.com",
+               "mock": OANDA_MOCK_URL}
+OANDA_STREAM_URL = os.getenv("OANDA_STREAM_URL", STREAM_URLS[OANDA_ENVIRONMENT])
+STREAM_READ_TIMEOUT = 20  # OANDA sends a heartbeat every 5 seconds, so silence this long means a dead connection
+
+daemon_status = {"status": "starting"}
+daemon_status_lock = threading.Lock()
+
+TELEGRAM_MAX_LENGTH = 4096  # Telegram's limit for one message
+TELEGRAM_SEND_INTERVAL = 1.0  # Telegram allows about one message per second per chat
+TELEGRAM_BATCH_DELAY = 0.5  # How long to wait for more lines before sending a batch
+# Point at the mock server to keep test runs off the real Bot API
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+telegram_session = requests.Session()
 
 # --- Telegram Helper Function ---
 def send_telegram(message: str):
-    """Sends a message to your Telegram bot and handles potential errors."""
+    """Sends a message to your Telegram bot and handles potential errors.
+
+    Returns the number of seconds Telegram asked us to wait before retrying, or 0.
+    """
     if not BOT_TOKEN or not CHAT_ID:
         sys.__stdout__.write("[!] Telegram credentials not found in .env file.\n")
-        return
+        return 0
 
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+    url = f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/sendMessage"
     payload = {"chat_id": CHAT_ID, "text": message}
     
     try:
-        requests.post(url, data=payload, timeout=10)
-    except requests.exceptions.RequestException as e:
+        response = telegram_session.post(url, data=payload, timeout=10)
+        if response.status_code == 429:
+            return response.json().get("parameters", {}).get("retry_after", 1)
+    except (requests.exceptions.RequestException, ValueError) as e:
         sys.__stdout__.write(f"[!] Critical Error: Failed to send Telegram message: {e}\n")
+    return 0
+
+def batch_messages(lines, limit=TELEGRAM_MAX_LENGTH):
+    """Joins log lines into as few messages as possible, each within Telegram's length limit."""
+    messages = []
+    current = ""
+    for line in lines:
+        while len(line) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+# --- Background Telegram Sink ---
+class TelegramSink:
+    """Sends log lines to Telegram from a background thread so callers never wait on the network.
+
+    Lines that arrive close together are coalesced into one message, sends are spaced out
+    to respect Telegram's rate limit, and anything still queued is flushed at exit.
+    """
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.last_send = 0.0
+        self.thread = threading.Thread(target=self._run, name="telegram-sink", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def send(self, message):
+        self.queue.put(message)
+
+    def _run(self):
+        closing = False
+        while not closing:
+            lines = [self.queue.get()]
+            deadline = time.monotonic() + TELEGRAM_BATCH_DELAY
+            while True:
+                try:
+                    lines.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            if None in lines:
+                closing = True
+                lines = [line for line in lines if line is not None]
+
+            for message in batch_messages(lines):
+                self._send_with_rate_limit(message)
+
+    def _send_with_rate_limit(self, message):
+        for _ in range(3):
+            time.sleep(max(0, self.last_send + TELEGRAM_SEND_INTERVAL - time.monotonic()))
+            retry_after = send_telegram(message)
+            self.last_send = time.monotonic()
+            if not retry_after:
+                return
+            time.sleep(retry_after)
+
+    def close(self, timeout=15):
+        """Flushes queued lines and stops the background thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+telegram_sink = TelegramSink()
 
 # --- Custom Logger to Redirect `print` to Console and Telegram ---
 class TelegramLogger:
@@ -44,7 +169,7 @@ class TelegramLogger:
             formatted_message = f"[{timestamp}] {message}"
             
             sys.__stdout__.write(formatted_message + "\n")
-            send_telegram(formatted_message)
+            telegram_sink.send(formatted_message)
 
     def flush(self):
         pass
@@ -53,6 +178,376 @@ class TelegramLogger:
 sys.stdout = TelegramLogger()
 sys.stderr = TelegramLogger()
 
+# --- Trade Closing ---
+def close_trade(client, trade_id):
+    """Closes one trade and returns (trade_id, P/L, seconds taken, error)."""
+    started = time.perf_counter()
+    try:
+        response = client.request(TradeClose(accountID=ACCOUNT_ID, tradeID=trade_id))
+        # We use .get() with a default of {} or 'N/A' to prevent errors if the key doesn't exist
+        pnl = response.get('orderFillTransaction', {}).get('pl', 'N/A')
+        return trade_id, pnl, time.perf_counter() - started, None
+    except Exception as e:
+        return trade_id, None, time.perf_counter() - started, e
+
+def close_trades(client, trades):
+    """Closes trades concurrently on a bounded pool, returning one result per trade."""
+    with ThreadPoolExecutor(max_workers=min(CLOSE_WORKERS, len(trades))) as pool:
+        return list(pool.map(lambda trade: close_trade(client, trade['id']), trades))
+
+def close_position(client, trades):
+    """Closes the whole INSTRUMENT position with one PositionClose request.
+
+    Every trade shares the latency of that single request.
+    """
+    data = {}
+    if any(float(trade.get("currentUnits", 0)) > 0 for trade in trades):
+        data["longUnits"] = "ALL"
+    if any(float(trade.get("currentUnits", 0)) < 0 for trade in trades):
+        data["shortUnits"] = "ALL"
+
+    started = time.perf_counter()
+    try:
+        response = client.request(PositionClose(accountID=ACCOUNT_ID, instrument=INSTRUMENT, data=data))
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        return [(trade['id'], None, elapsed, e) for trade in trades]
+    elapsed = time.perf_counter() - started
+
+    closed = {}
+    for side in ("longOrderFillTransaction", "shortOrderFillTransaction"):
+        for trade_closed in response.get(side, {}).get("tradesClosed", []):
+            closed[trade_closed["tradeID"]] = trade_closed.get("realizedPL", "N/A")
+
+    return [
+        (trade['id'], closed[trade['id']], elapsed, None) if trade['id'] in closed
+        else (trade['id'], None, elapsed, Exception("Not closed by the position close request."))
+        for trade in trades
+    ]
+
+def summarize_close_results(results):
+    """Builds one P/L summary, with per-trade latency, for a batch of close results."""
+    closed = [result for result in results if result[3] is None]
+    total_pnl = 0.0
+    lines = []
+    for trade_id, pnl, elapsed, error in results:
+        if error is None:
+            lines.append(f"  ✅ Trade {trade_id}: P/L {pnl} ({elapsed * 1000:.0f} ms)")
+            try:
+                total_pnl += float(pnl)
+            except (TypeError, ValueError):
+                pass
+        else:
+            lines.append(f"  ❌ Trade {trade_id}: failed after {elapsed * 1000:.0f} ms. Reason: {error}")
+
+    header = f"💰 Closed {len(closed)}/{len(results)} trade(s) on '{INSTRUMENT}'. Total P/L: {total_pnl:.2f}"
+    return "\n".join([header] + lines)
+
+def close_matching_trades(client, matching_trades):
+    """Closes the given INSTRUMENT trades using CLOSE_MODE and prints the summary."""
+    print(f"🎯 Found {len(matching_trades)} matching trade(s)! Closing them ({CLOSE_MODE} mode)...")
+    if CLOSE_MODE == "position":
+        results = close_position(client, matching_trades)
+    else:
+        results = close_trades(client, matching_trades)
+    print(summarize_close_results(results))
+    return results
+
+# --- Daemon Mode ---
+class StatusHandler(BaseHTTPRequestHandler):
+    """Serves the daemon status as JSON on /health."""
+    def do_GET(self):
+        if self.path not in ("/", "/health"):
+            self.send_error(404)
+            return
+        with daemon_status_lock:
+            body = json.dumps(daemon_status).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep health checks out of the Telegram log
+
+def start_status_server(port, host=STATUS_HOST):
+    """Starts the /health endpoint on a background thread."""
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    threading.Thread(target=server.serve_forever, name="status-server", daemon=True).start()
+    return server
+
+def update_daemon_status(**fields):
+    with daemon_status_lock:
+        daemon_status.update(fields)
+
+def parse_close_times(value):
+    """Parses "HH:MM,HH:MM" into a list of times."""
+    return [datetime.strptime(part.strip(), "%H:%M").time() for part in value.split(",") if part.strip()]
+
+def due_close_time(now, close_times, fired):
+    """Returns the first cutoff that has passed today and not fired yet, marking it as fired."""
+    for close_time in close_times:
+        key = (now.date(), close_time)
+        if now.time() >= close_time and key not in fired:
+            fired.add(key)
+            return close_time
+    return None
+
+def pnl_trigger(unrealized_pl):
+    """Returns why the unrealized P/L should close the trades, or None."""
+    if CLOSE_ON_PROFIT is not None and unrealized_pl >= CLOSE_ON_PROFIT:
+        return f"unrealized P/L {unrealized_pl:.2f} reached the profit target of {CLOSE_ON_PROFIT:.2f}"
+    if CLOSE_ON_LOSS is not None and unrealized_pl <= -CLOSE_ON_LOSS:
+        return f"unrealized P/L {unrealized_pl:.2f} hit the loss limit of -{CLOSE_ON_LOSS:.2f}"
+    return None
+
+def close_reason(close_times, fired, unrealized_pl):
+    """Returns why the INSTRUMENT trades should be closed now, or None."""
+    cutoff = due_close_time(datetime.now(), close_times, fired)
+    if cutoff:
+        return f"session cutoff {cutoff:%H:%M} reached"
+    return pnl_trigger(unrealized_pl) if unrealized_pl is not None else None
+
+def close_for_reason(client, matching_trades, reason):
+    print(f"⏰ Closing '{INSTRUMENT}' trades: {reason}.")
+    results = close_matching_trades(client, matching_trades)
+    update_daemon_status(last_close=datetime.now().isoformat(), last_close_reason=reason,
+                         last_close_failures=sum(1 for result in results if result[3] is not None))
+    return results
+
+class CloseBackoff:
+    """Holds back closing the same trades again after a failed close.
+
+    A trigger that stays true would otherwise send a close request (and a Telegram
+    report) on every poll or price while the market is halted or OANDA refuses the
+    close. The wait starts at CLOSE_RETRY_SECONDS and doubles with every failure; it
+    ends when the trades change or the trigger clears.
+    """
+    def __init__(self, delay=CLOSE_RETRY_SECONDS, max_delay=CLOSE_RETRY_MAX_SECONDS):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.reset()
+
+    def reset(self):
+        self.trade_ids = None
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def ready(self, trade_ids, now=None):
+        """Returns whether the given trades may be closed now."""
+        if frozenset(trade_ids) != self.trade_ids:
+            self.reset()
+        return (now if now is not None else time.monotonic()) >= self.retry_at
+
+    def record(self, trade_ids, results, now=None):
+        """Starts or lengthens the wait if any trade failed to close."""
+        if all(result[3] is None for result in results):
+            self.reset()
+            return
+        wait = min(self.delay * 2 ** self.failures, self.max_delay)
+        self.trade_ids = frozenset(trade_ids)
+        self.failures += 1
+        self.retry_at = (now if now is not None else time.monotonic()) + wait
+        print(f"⏳ Not retrying the close of '{INSTRUMENT}' trades for {wait:.0f} s.")
+
+def close_when_due(client, trades, close_times, fired, unrealized_pl, backoff):
+    """Closes the trades if a cutoff or P/L trigger says so, returning the close results or None."""
+    trade_ids = [trade["id"] for trade in trades]
+    # Checked first so a cutoff that comes due while waiting still fires once the wait is over
+    if not backoff.ready(trade_ids):
+        if unrealized_pl is None or pnl_trigger(unrealized_pl):
+            return None
+        backoff.reset()  # The P/L trigger has cleared
+    reason = close_reason(close_times, fired, unrealized_pl)
+    if not reason or not trades:
+        backoff.reset()
+        return None
+    results = close_for_reason(client, trades, reason)
+    backoff.record(trade_ids, results)
+    return results
+
+def run_daemon():
+    """Keeps one OANDA client alive and closes INSTRUMENT trades at CLOSE_AT times or on P/L triggers."""
+    print(f"🤖 OANDA Trade Closer Bot: Daemon started for '{INSTRUMENT}'.")
+    close_times = parse_close_times(CLOSE_AT)
+    client = oandapyV20.API(access_token=API_KEY, environment=OANDA_API_ENVIRONMENT)
+
+    # Cutoffs already behind us today should not fire the moment the daemon starts
+    fired = {(datetime.now().date(), t) for t in close_times if datetime.now().time() >= t}
+
+    start_status_server(STATUS_PORT)
+    update_daemon_status(started=datetime.now().isoformat(), instrument=INSTRUMENT, close_at=CLOSE_AT)
+
+    backoff = CloseBackoff()
+    last_error = None
+    while True:
+        try:
+            resp = client.request(OpenTrades(accountID=ACCOUNT_ID))
+            matching_trades = [t for t in resp.get("trades", []) if t.get("instrument") == INSTRUMENT]
+            unrealized_pl = sum(float(t.get("unrealizedPL", 0)) for t in matching_trades)
+            update_daemon_status(status="ok", last_poll=datetime.now().isoformat(),
+                                 open_trades=len(matching_trades), unrealized_pl=unrealized_pl)
+            last_error = None
+
+            close_when_due(client, matching_trades, close_times, fired, unrealized_pl, backoff)
+
+        except Exception as e:
+            update_daemon_status(status="error", last_error=str(e))
+            # Only report an error once until the next successful poll
+            if str(e) != last_error:
+                print(f"❌ ERROR: Daemon poll failed. {e}")
+                last_error = str(e)
+
+        time.sleep(POLL_SECONDS)
+
+# --- Streaming Mode ---
+class OpenTradeBook:
+    """In-memory view of the open INSTRUMENT trades, kept current from stream events.
+
+    Unrealized P/L is marked to the latest bid (longs) or ask (shorts) and converted to
+    the account currency with the price's quoteHomeConversionFactors when OANDA sends them.
+    """
+    def __init__(self):
+        self.trades = {}
+        self.bid = None
+        self.ask = None
+        self.conversion_factors = {}
+
+    def load(self, trades):
+        """Replaces the view with a REST OpenTrades snapshot."""
+        self.trades = {
+            trade["id"]: {"units": float(trade["currentUnits"]), "price": float(trade["price"])}
+            for trade in trades if trade.get("instrument") == INSTRUMENT
+        }
+
+    def apply_transaction(self, transaction):
+        """Applies an ORDER_FILL from the transaction stream to the open trades."""
+        if transaction.get("type") != "ORDER_FILL" or transaction.get("instrument") != INSTRUMENT:
+            return
+        opened = transaction.get("tradeOpened")
+        if opened:
+            self.trades[opened["tradeID"]] = {
+                "units": float(opened["units"]),
+                "price": float(opened.get("price", transaction.get("price"))),
+            }
+        for closed in transaction.get("tradesClosed", []):
+            self.trades.pop(closed["tradeID"], None)
+        reduced = transaction.get("tradeReduced")
+        if reduced and reduced["tradeID"] in self.trades:
+            self.trades[reduced["tradeID"]]["units"] += float(reduced["units"])
+
+    def apply_price(self, price):
+        """Applies a PRICE message from the pricing stream."""
+        if price.get("type") != "PRICE" or price.get("instrument") != INSTRUMENT:
+            return
+        self.bid = float(price["bids"][0]["price"])
+        self.ask = float(price["asks"][0]["price"])
+        self.conversion_factors = price.get("quoteHomeConversionFactors", self.conversion_factors)
+
+    def unrealized_pl(self):
+        if self.bid is None:
+            return None
+        total = 0.0
+        for trade in self.trades.values():
+            if trade["units"] > 0:
+                pnl = (self.bid - trade["price"]) * trade["units"]
+                factor = self.conversion_factors.get("positiveUnits", 1)
+            else:
+                pnl = (self.ask - trade["price"]) * trade["units"]
+                factor = self.conversion_factors.get("negativeUnits", 1)
+            total += pnl * float(factor)
+        return total
+
+    def trade_list(self):
+        """Returns the open trades in the shape the close functions expect."""
+        return [{"id": trade_id, "currentUnits": str(trade["units"])} for trade_id, trade in self.trades.items()]
+
+def read_stream(session, url, params=None):
+    """Yields each JSON message of an OANDA chunked stream, skipping heartbeats."""
+    with session.get(url, params=params, stream=True, timeout=(10, STREAM_READ_TIMEOUT)) as response:
+        if response.status_code != 200:
+            raise Exception(f"Stream error: {response.status_code} - {response.text}")
+        for line in response.iter_lines():
+            if not line:
+                continue
+            message = json.loads(line)
+            if message.get("type") != "HEARTBEAT":
+                yield message
+
+def follow_stream(name, path, params, events):
+    """Keeps one stream connected, reconnecting with backoff, and pushes its messages onto events."""
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {API_KEY}"
+    delay = 1
+    while True:
+        try:
+            for message in read_stream(session, OANDA_STREAM_URL + path, params):
+                events.put((name, message))
+                delay = 1
+        except Exception as e:
+            events.put(("error", f"{name} stream: {e}"))
+        time.sleep(delay)
+        delay = min(delay * 2, 30)
+        # Events may have been missed while disconnected
+        events.put(("resync", None))
+
+def run_stream():
+    """Follows OANDA's transaction and pricing streams and closes INSTRUMENT trades on CLOSE_AT or P/L triggers."""
+    print(f"🤖 OANDA Trade Closer Bot: Streaming monitor started for '{INSTRUMENT}'.")
+    close_times = parse_close_times(CLOSE_AT)
+    fired = {(datetime.now().date(), t) for t in close_times if datetime.now().time() >= t}
+    client = oandapyV20.API(access_token=API_KEY, environment=OANDA_API_ENVIRONMENT)
+    book = OpenTradeBook()
+
+    def resync():
+        book.load(client.request(OpenTrades(accountID=ACCOUNT_ID)).get("trades", []))
+
+    start_status_server(STATUS_PORT)
+    update_daemon_status(started=datetime.now().isoformat(), instrument=INSTRUMENT, close_at=CLOSE_AT)
+    resync()
+
+    events = queue.Queue()
+    streams = [
+        ("transaction", f"/v3/accounts/{ACCOUNT_ID}/transactions/stream", None),
+        ("price", f"/v3/accounts/{ACCOUNT_ID}/pricing/stream", {"instruments": INSTRUMENT}),
+    ]
+    for name, path, params in streams:
+        threading.Thread(target=follow_stream, args=(name, path, params, events), name=f"{name}-stream",
+                         daemon=True).start()
+
+    backoff = CloseBackoff()
+    last_error = None
+    while True:
+        try:
+            kind, message = events.get(timeout=1)
+        except queue.Empty:
+            kind, message = None, None  # Still check the cutoff times
+
+        try:
+            if kind == "transaction":
+                book.apply_transaction(message)
+            elif kind == "price":
+                book.apply_price(message)
+            elif kind == "resync":
+                resync()
+            elif kind == "error":
+                raise Exception(message)
+
+            unrealized_pl = book.unrealized_pl()
+            update_daemon_status(status="ok", last_event=datetime.now().isoformat(),
+                                 open_trades=len(book.trades), unrealized_pl=unrealized_pl)
+
+            if close_when_due(client, book.trade_list(), close_times, fired, unrealized_pl, backoff):
+                resync()
+            last_error = None
+
+        except Exception as e:
+            update_daemon_status(status="error", last_error=str(e))
+            if str(e) != last_error:
+                print(f"❌ ERROR: Streaming monitor: {e}")
+                last_error = str(e)
+
 # --- Main Application Logic ---
 def main():
     """Main function to run the trading bot logic."""
@@ -60,10 +555,10 @@ def main():
 
     # --- Connect to OANDA ---
     try:
-        client = oandapyV20.API(access_token=API_KEY)
+        client = oandapyV20.API(access_token=API_KEY, environment=OANDA_API_ENVIRONMENT)
         request = AccountSummary(accountID=ACCOUNT_ID)
         client.request(request)
-        print("✅ Successfully connected to OANDA demo account.")
+        print(f"✅ Successfully connected to OANDA {OANDA_ENVIRONMENT} account.")
     except Exception as e:
         print(f"❌ FATAL: Could not connect to OANDA. {e}")
         return
@@ -84,32 +579,26 @@ def main():
 
     # --- Process and Close Trades ---
     print(f"🔎 Found {len(open_trades)} open trade(s). Checking for '{INSTRUMENT}'.")
-    nas100_trades_found = False
-    for trade in open_trades:
-        if trade.get("instrument") == INSTRUMENT:
-            nas100_trades_found = True
-            trade_id = trade['id']
-            print(f"🎯 Found matching trade! Attempting to close Trade ID: {trade_id}...")
-            
-            try:
-                close_req = TradeClose(accountID=ACCOUNT_ID, tradeID=trade_id)
-                # 2. ADDED: Capture the response from the close request
-                response = client.request(close_req)
-                print(f"✅ Successfully closed trade {trade_id}.")
-                
-                # 2. ADDED: Get profit/loss from the response and print it
-                # We use .get() with a default of {} or 'N/A' to prevent errors if the key doesn't exist
-                pnl = response.get('orderFillTransaction', {}).get('pl', 'N/A')
-                print(f"💰 P/L for trade {trade_id}: {pnl}")
-
-            except Exception as e:
-                print(f"❌ ERROR: Failed to close trade {trade_id}. Reason: {e}")
-
-    if not nas100_trades_found:
+    matching_trades = [trade for trade in open_trades if trade.get("instrument") == INSTRUMENT]
+    if not matching_trades:
         print(f"👍 No open trades for '{INSTRUMENT}' were found among the open positions.")
+    else:
+        close_matching_trades(client, matching_trades)
 
     print("🏁 OANDA Trade Closer Bot: Script finished.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Close OANDA trades on OANDA_INSTRUMENT.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and close trades at CLOSE_AT times or on P/L triggers")
+    parser.add_argument("--stream", action="store_true",
+                        help="like --daemon, but react to OANDA's transaction and pricing streams instead of polling")
+    args = parser.parse_args()
+
+    if args.stream:
+        run_stream()
+    elif args.daemon:
+        run_daemon()
+    else:
+        main()
\ No newline at end of file
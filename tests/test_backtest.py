@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from daytrading.backtest import LEVEL_NAMES, SESSION_LENGTH, intraday_matrix, key_level_matrix, simulate
+from daytrading.candle_series import CandleSeries
+from daytrading.key_levels import build_key_level_index, trading_dates
+from daytrading.mock_server import MockAccount
+
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def daily():
+    params = {"granularity": "D", "price": "MBA", "datetimeFormat": "UNIX",
+              "from": str(START.timestamp()), "to": str(END.timestamp())}
+    data = MockAccount().candles("EUR_USD", params, END.timestamp())
+    return CandleSeries.from_oanda(data["candles"])
+
+
+# The matrix must give every session the levels the live tool shows on that session's day
+def test_key_level_matrix_matches_live_index(daily):
+    levels = key_level_matrix(daily.side("bid"))
+    dates = trading_dates(daily)
+    first = int(np.searchsorted(dates, np.datetime64("2023-01-01")))
+    for i in range(first, len(daily)):
+        day_dates = [datetime.combine(dates[i - n].item(), datetime.min.time(), timezone.utc) for n in (1, 2, 3)]
+        index = build_key_level_index("EUR_USD", daily[:i], day_dates, dates[i].item().year - 1)
+        expected = [index.levels.get(name, np.nan) for name in LEVEL_NAMES]
+        np.testing.assert_array_equal(levels[i], expected, err_msg=str(dates[i]))
+
+
+@pytest.mark.parametrize("target", [0, -3, len(LEVEL_NAMES) + 1])
+def test_simulate_rejects_targets_beyond_the_levels(daily, target):
+    with pytest.raises(ValueError):
+        simulate(daily, daily[:0], "LONG", target=target)
+
+
+# H1 candles fetched up to now run past the last closed daily candle; they belong to no session
+def test_intraday_matrix_stops_at_the_end_of_the_last_session(daily):
+    # Ending on a Tuesday, so the hours of Wednesday's session follow the last daily candle
+    # (days + 3) % 7 counts from Monday, as in key_level_matrix
+    last = int(np.flatnonzero((trading_dates(daily).astype(np.int64) + 3) % 7 == 1)[-1])
+    sessions = daily[last - 4:last + 1]
+    params = {"granularity": "H1", "price": "MBA", "datetimeFormat": "UNIX",
+              "from": str(sessions.time[0]), "to": str(sessions.time[-1] + 3 * SESSION_LENGTH)}
+    hourly = CandleSeries.from_oanda(MockAccount().candles("EUR_USD", params, END.timestamp())["candles"])
+    assert hourly.time[-1] >= sessions.time[-1] + SESSION_LENGTH
+
+    highs, lows = intraday_matrix(sessions, hourly)
+    counts = (~np.isnan(highs)).sum(axis=1)
+    expected = [np.count_nonzero((hourly.time >= start) & (hourly.time < end))
+                for start, end in zip(sessions.time, np.r_[sessions.time[1:], sessions.time[-1] + SESSION_LENGTH])]
+    assert counts.tolist() == expected
+    assert counts[-1] <= 24
+    in_last = (hourly.time >= sessions.time[-1]) & (hourly.time < sessions.time[-1] + SESSION_LENGTH)
+    assert np.nanmax(highs[-1]) == hourly.high[in_last].max()
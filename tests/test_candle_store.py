@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+import numpy as np
+from daytrading.candle_series import CandleSeries
+from daytrading.candle_store import CandleStore
+from daytrading.mock_server import MockAccount
+
+NOW = datetime(2025, 3, 12, 10, tzinfo=timezone.utc)
+
+
+class MockFetch:
+    """Fetches daily EUR_USD candles from a MockAccount as of NOW, recording each requested range."""
+    def __init__(self):
+        self.account = MockAccount()
+        self.ranges = []
+
+    def __call__(self, start_date, end_date):
+        self.ranges.append((start_date, end_date))
+        params = {"granularity": "D", "price": "MBA", "datetimeFormat": "UNIX",
+                  "from": str(start_date.timestamp()), "to": str(end_date.timestamp())}
+        return CandleSeries.from_oanda(self.account.candles("EUR_USD", params, NOW.timestamp())["candles"])
+
+
+def day(month, date):
+    return datetime(2025, month, date, tzinfo=timezone.utc)
+
+
+def test_only_the_missing_range_is_fetched(tmp_path):
+    store = CandleStore(str(tmp_path / "candles.db"))
+    fetch = MockFetch()
+    store.get_candles("EUR_USD", day(1, 1), day(2, 1), fetch)
+    store.get_candles("EUR_USD", day(1, 15), day(3, 1), fetch)
+    assert fetch.ranges == [(day(1, 1), day(2, 1)), (day(2, 1), day(3, 1))]
+
+    # A range that is synced in full comes from the store, also after reopening it
+    candles = CandleStore(str(tmp_path / "candles.db")).get_candles("EUR_USD", day(1, 1), day(3, 1), fetch)
+    assert len(fetch.ranges) == 2
+    expected = fetch(day(1, 1), day(3, 1))
+    np.testing.assert_array_equal(candles.time, expected.time)
+    np.testing.assert_array_equal(candles.bid_close, expected.bid_close)
+
+
+def test_gap_between_synced_ranges_is_filled(tmp_path):
+    store = CandleStore(str(tmp_path / "candles.db"))
+    fetch = MockFetch()
+    store.get_candles("EUR_USD", day(1, 1), day(1, 20), fetch)
+    store.get_candles("EUR_USD", day(2, 10), day(2, 28), fetch)
+    store.get_candles("EUR_USD", day(1, 1), day(2, 28), fetch)
+    assert fetch.ranges[2:] == [(day(1, 20), day(2, 10))]
+    assert store.missing_ranges("EUR_USD", day(1, 1), day(2, 28)) == []
+
+
+def test_open_candle_is_refetched_until_it_closes(tmp_path):
+    store = CandleStore(str(tmp_path / "candles.db"))
+    fetch = MockFetch()
+    candles = store.get_candles("EUR_USD", day(3, 1), NOW, fetch)
+    assert not candles.complete[-1]
+
+    # Only the still-open session is asked for again
+    store.get_candles("EUR_USD", day(3, 1), NOW, fetch)
+    assert fetch.ranges[1] == (datetime.fromtimestamp(candles.time[-1], timezone.utc), NOW)
+    assert len(store.load("EUR_USD", day(3, 1), NOW)) == len(candles) - 1
@@ -0,0 +1,38 @@
+import pytest
+from daytrading.config import read_base_url, read_config, read_environment
+from daytrading.oanda_client import LIVE_URL
+
+
+def write_config(tmp_path, text):
+    path = tmp_path / "config.ini"
+    path.write_text(text)
+    return str(path)
+
+
+def test_credentials_only_in_the_environment_section(tmp_path):
+    config_file = write_config(tmp_path, "[oanda]\nenvironment = live\n\n"
+                                         "[oanda.live]\napi_key = LIVE_KEY\naccount_id = 001-001-1-001\n")
+    environment = read_environment(config_file)
+    assert read_config(config_file, environment) == ("LIVE_KEY", "001-001-1-001")
+    assert read_base_url(config_file, environment) == LIVE_URL
+
+
+def test_environment_section_falls_back_to_oanda(tmp_path):
+    config_file = write_config(tmp_path, "[oanda]\napi_key = KEY\naccount_id = 101-001-1-001\n\n"
+                                         "[oanda.live]\naccount_id = 001-001-1-001\n")
+    assert read_config(config_file, "live") == ("KEY", "001-001-1-001")
+    assert read_config(config_file, "demo") == ("KEY", "101-001-1-001")
+
+
+def test_missing_credentials_name_the_sections(tmp_path):
+    config_file = write_config(tmp_path, "[oanda]\nenvironment = demo\n")
+    with pytest.raises(Exception, match=r"\[oanda.demo\] or \[oanda\]"):
+        read_config(config_file, "demo")
+
+
+def test_misspelled_environment_lists_the_known_ones(tmp_path):
+    config_file = write_config(tmp_path, "[oanda]\nenvironment = paper\n")
+    with pytest.raises(Exception, match="use one of demo, live, mock"):
+        read_environment(config_file)
+    with pytest.raises(Exception, match="use one of demo, live, mock"):
+        read_base_url(config_file, "lvie")
@@ -0,0 +1,36 @@
+import json
+import time
+import pytest
+from daytrading.instrument_catalog import InstrumentCatalog
+
+
+class FailingFetch:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        raise Exception("offline")
+
+
+def test_failed_refresh_uses_stale_copy_without_refetching(tmp_path):
+    path = tmp_path / "instruments.json"
+    path.write_text(json.dumps({"fetched_at": time.time() - 2 * 24 * 60 * 60,
+                                "categories": {"Forex": ["EUR_USD"]}, "pip_locations": {"EUR_USD": -4}}))
+    fetch = FailingFetch()
+    catalog = InstrumentCatalog(fetch, path=str(path))
+    for _ in range(5):
+        assert catalog.instruments("Forex") == ["EUR_USD"]
+        assert catalog.pip_location("EUR_USD") == -4
+    assert fetch.calls == 1
+    assert catalog.is_loaded()
+
+
+def test_failed_first_fetch_is_not_retried_until_retry_after(tmp_path):
+    fetch = FailingFetch()
+    catalog = InstrumentCatalog(fetch, path=str(tmp_path / "instruments.json"), retry_after=60)
+    for _ in range(5):
+        with pytest.raises(Exception, match="offline"):
+            catalog.categories()
+    assert fetch.calls == 1
+    assert not catalog.is_loaded()
@@ -0,0 +1,46 @@
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from daytrading.candle_series import CandleSeries
+from daytrading.key_levels import (build_key_level_index, get_previous_year_range, previous_trading_days,
+                                   slice_daily_candles, trading_dates)
+from daytrading.mock_server import MockAccount
+
+
+# Function to get the mock server's daily EUR_USD candles as the tool would have fetched them at `now`
+def fetched_candles(now, end_date):
+    start_date, _ = get_previous_year_range(end_date)
+    params = {"granularity": "D", "price": "MBA", "datetimeFormat": "UNIX",
+              "from": str(start_date.timestamp()), "to": str(end_date.timestamp())}
+    data = MockAccount().candles("EUR_USD", params, now.timestamp())
+    return CandleSeries.from_oanda(data["candles"])
+
+
+@pytest.mark.parametrize("now, expected", [
+    # Monday afternoon in Singapore: the shifted clock is still on Sunday
+    (datetime(2025, 3, 10, 6, 30, tzinfo=timezone.utc), [date(2025, 3, 7), date(2025, 3, 6), date(2025, 3, 5)]),
+    # Shifted clock between 21:00 and 24:00, when the next session's candle has already opened
+    (datetime(2025, 3, 11, 6, 30, tzinfo=timezone.utc), [date(2025, 3, 7), date(2025, 3, 6), date(2025, 3, 5)]),
+    (datetime(2025, 3, 12, 5, 30, tzinfo=timezone.utc), [date(2025, 3, 10), date(2025, 3, 7), date(2025, 3, 6)]),
+    (datetime(2025, 3, 14, 7, 59, tzinfo=timezone.utc), [date(2025, 3, 12), date(2025, 3, 11), date(2025, 3, 10)]),
+])
+def test_previous_sessions(now, expected):
+    utc_now, day_dates = previous_trading_days(now)
+    candles = fetched_candles(now, day_dates[0])
+    sessions = slice_daily_candles(candles, day_dates)
+    assert [d.item() for d in trading_dates(candles)[sessions]] == expected
+
+    index = build_key_level_index("EUR_USD", candles, day_dates, utc_now.year - 1)
+    assert index.trading_day == expected[0]
+    assert index.levels["Close of previous day"] == candles.bid_close[sessions[0]]
+    assert index.levels["3 days ago Low"] == candles.bid_low[sessions[2]]
+
+
+def test_every_hour_of_a_fortnight_uses_three_distinct_sessions():
+    start = datetime(2025, 3, 3, tzinfo=timezone.utc)
+    for hour in range(14 * 24):
+        now = start + timedelta(hours=hour)
+        _, day_dates = previous_trading_days(now)
+        candles = fetched_candles(now, day_dates[0])
+        sessions = trading_dates(candles)[slice_daily_candles(candles, day_dates)]
+        # Every weekday has a session, so the sessions are exactly the previous trading days
+        assert [d.item() for d in sessions] == [d.date() for d in day_dates], now
@@ -0,0 +1,124 @@
+import sys
+import pytest
+
+
+@pytest.fixture(scope="module")
+def main():
+    """Imports main.py, giving back the stdout and stderr it takes over for Telegram."""
+    stdout, stderr = sys.stdout, sys.stderr
+    try:
+        import main
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    return main
+
+
+class RefusingClient:
+    """Stands in for oandapyV20.API, refusing every request like a halted market."""
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, endpoint):
+        self.requests += 1
+        raise Exception("MARKET_HALTED")
+
+
+def trades(*ids):
+    return [{"id": trade_id, "instrument": "EUR_USD", "currentUnits": "1000"} for trade_id in ids]
+
+
+def test_close_backoff_doubles_up_to_the_maximum(main):
+    backoff = main.CloseBackoff(delay=30, max_delay=100)
+    failed = [("1", None, 0.1, Exception("MARKET_HALTED"))]
+    waits = []
+    now = 0.0
+    for _ in range(4):
+        assert backoff.ready(["1"], now)
+        backoff.record(["1"], failed, now)
+        waits.append(backoff.retry_at - now)
+        assert not backoff.ready(["1"], backoff.retry_at - 1)
+        now = backoff.retry_at
+    assert waits == [30, 60, 100, 100]
+
+    backoff.record(["1"], [("1", "2.50", 0.1, None)], now)
+    assert backoff.failures == 0
+
+
+def test_failed_close_is_not_retried_while_the_trigger_holds(main, monkeypatch):
+    monkeypatch.setattr(main, "CLOSE_ON_LOSS", 50.0)
+    monkeypatch.setattr(main, "CLOSE_MODE", "trades")
+    client = RefusingClient()
+    backoff = main.CloseBackoff(delay=60)
+
+    for _ in range(20):
+        main.close_when_due(client, trades("1", "2"), [], set(), -75.0, backoff)
+    assert client.requests == 2  # One close attempt, one request per trade
+
+    # New trades are tried straight away
+    main.close_when_due(client, trades("1", "2", "3"), [], set(), -75.0, backoff)
+    assert client.requests == 5
+
+    # Once the loss recovers past the limit the wait is over, so the next breach closes again
+    assert main.close_when_due(client, trades("1", "2", "3"), [], set(), -10.0, backoff) is None
+    main.close_when_due(client, trades("1", "2", "3"), [], set(), -75.0, backoff)
+    assert client.requests == 8
+
+
+# The streaming monitor checks the trigger on every price, so the backoff is what keeps it from retrying
+def test_stream_prices_do_not_retry_a_failed_close(main, monkeypatch):
+    monkeypatch.setattr(main, "INSTRUMENT", "EUR_USD")
+    monkeypatch.setattr(main, "CLOSE_ON_LOSS", 5.0)
+    monkeypatch.setattr(main, "CLOSE_MODE", "position")
+    client = RefusingClient()
+    backoff = main.CloseBackoff(delay=60)
+    book = main.OpenTradeBook()
+    book.load([dict(trade, price="1.1000") for trade in trades("1", "2")])
+
+    for tick in range(50):
+        bid = 1.0900 - tick * 0.0001
+        book.apply_price({"type": "PRICE", "instrument": "EUR_USD",
+                          "bids": [{"price": str(bid)}], "asks": [{"price": str(bid + 0.0002)}]})
+        main.close_when_due(client, book.trade_list(), [], set(), book.unrealized_pl(), backoff)
+    assert client.requests == 1  # One PositionClose for both trades
+
+
+def test_batch_messages_joins_lines_up_to_the_limit(main):
+    lines = [f"line {i}" for i in range(5)]
+    assert main.batch_messages(lines) == ["\n".join(lines)]
+    # "line 0\nline 1" is 13 characters; a third line would make it 20
+    assert main.batch_messages(lines, limit=15) == ["line 0\nline 1", "line 2\nline 3", "line 4"]
+
+
+def test_batch_messages_splits_at_the_telegram_limit(main):
+    long_line = "x" * (main.TELEGRAM_MAX_LENGTH * 2 + 10)
+    messages = main.batch_messages(["before", long_line, "after"])
+    assert all(len(message) <= main.TELEGRAM_MAX_LENGTH for message in messages)
+    assert messages == ["before", "x" * main.TELEGRAM_MAX_LENGTH, "x" * main.TELEGRAM_MAX_LENGTH, "x" * 10 + "\nafter"]
+    assert "".join(messages).replace("\n", "") == "before" + long_line + "after"
+
+
+def test_sink_batches_lines_and_flushes_on_close(main, monkeypatch):
+    sent = []
+    monkeypatch.setattr(main, "send_telegram", lambda message: sent.append(message) or 0)
+    monkeypatch.setattr(main, "TELEGRAM_SEND_INTERVAL", 0)
+    sink = main.TelegramSink()
+    for i in range(100):
+        sink.send(f"line {i}")
+    sink.close()
+    assert not sink.thread.is_alive()
+    assert "\n".join(sent) == "\n".join(f"line {i}" for i in range(100))
+    assert len(sent) < 5  # Lines sent together go out as one message
+
+
+def test_sink_waits_out_telegram_429s(main, monkeypatch):
+    answers = [2, 0]  # retry_after from a 429, then success
+    sent = []
+    monkeypatch.setattr(main, "send_telegram", lambda message: sent.append(message) or answers.pop(0))
+    monkeypatch.setattr(main, "TELEGRAM_SEND_INTERVAL", 0)
+    sleeps = []
+    monkeypatch.setattr(main.time, "sleep", sleeps.append)
+    sink = main.TelegramSink()
+    sink.send("only line")
+    sink.close()
+    assert sent == ["only line", "only line"]
+    assert 2 in sleeps
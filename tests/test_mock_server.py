@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import threading
+import pytest
+import requests
+from daytrading import candles
+from daytrading.key_levels import fetch_key_level_index, previous_trading_days
+from daytrading.mock_server import MockServer
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+ACCOUNT_ID = "101-003-12345678-001"
+
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """Starts mock servers on free ports; the candle store they fill lands in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(candles, "_stores", {})
+    servers = []
+
+    def start(**options):
+        server = MockServer(("127.0.0.1", 0), **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+# Retries behind 429s and injected 5xx errors must not change the levels
+def test_levels_survive_rate_limits_and_errors(serve, tmp_path, monkeypatch):
+    clean = serve()
+    flaky = serve(rate_limit=2, error_rate=0.3, latency=0.01, jitter=0.01, seed=7)
+    utc_now, day_dates = previous_trading_days()
+
+    # Each server gets its own candle store so neither answers from the other's cache
+    levels = {}
+    for name, server in [("clean", clean), ("flaky", flaky)]:
+        (tmp_path / name).mkdir()
+        monkeypatch.chdir(tmp_path / name)
+        monkeypatch.setattr(candles, "_stores", {})
+        levels[name] = [fetch_key_level_index(f"{name}-key", ACCOUNT_ID, instrument, utc_now, day_dates, server.url)
+                        for instrument in ["EUR_USD", "XAG_USD", "XAU_AUD"]]
+
+    for expected, index in zip(levels["clean"], levels["flaky"]):
+        assert index.levels == expected.levels and index.ask_levels == expected.ask_levels
+    stats = requests.get(f"{flaky.url}/mock/state").json()["requests"]
+    assert stats["rate_limited"] > 0 and stats["injected_errors"] > 0
+
+
+# main.py closes the EUR_USD position and its log reaches Telegram through the 429s
+def test_trade_closer_closes_position_and_reports_to_telegram(serve, tmp_path):
+    server = serve(telegram_rate_limit=1, seed=3)
+    env = dict(os.environ, OANDA_ENVIRONMENT="mock", OANDA_MOCK_URL=server.url, TELEGRAM_API_URL=server.url,
+               OANDA_API_KEY="key", OANDA_ACCOUNT_ID=ACCOUNT_ID, OANDA_INSTRUMENT="EUR_USD",
+               TELEGRAM_BOT_TOKEN="token", TELEGRAM_CHAT_ID="42", CLOSE_MODE="position")
+    subprocess.run([sys.executable, MAIN], env=env, cwd=tmp_path, check=True, timeout=60, capture_output=True)
+
+    state = requests.get(f"{server.url}/mock/state").json()
+    closed = sorted(trade["tradeID"] for fill in state["transactions"] for trade in fill["tradesClosed"])
+    assert closed == ["991", "995"]
+    assert state["openTrades"] == []
+    log = "\n".join(message["text"] for message in state["telegram"])
+    assert "Closed 2/2 trade(s) on 'EUR_USD'" in log
+    assert "Script finished" in log
@@ -0,0 +1,67 @@
+import json
+import os
+import time
+import pytest
+from daytrading.instrument_catalog import InstrumentCatalog
+from daytrading.mock_server import FIXTURES_DIR, MockAccount
+from daytrading.position_size import ConversionRates, calculate_position_sizes
+
+ACCOUNT_ID = "101-003-12345678-001"
+
+
+class MockGet:
+    """Answers the OANDA client's get() from a MockAccount, counting the calls."""
+    def __init__(self):
+        self.account = MockAccount()
+        self.calls = 0
+
+    def __call__(self, path, params=None):
+        self.calls += 1
+        if path.endswith("/summary"):
+            return self.account.account_summary(ACCOUNT_ID, time.time())
+        return self.account.pricing(params["instruments"].split(","), time.time(), include_home_conversions=True)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with open(os.path.join(FIXTURES_DIR, "instruments.json"), "r") as file:
+        instruments = json.load(file)["instruments"]
+    return InstrumentCatalog(lambda: instruments, path=str(tmp_path / "instruments.json"))
+
+
+def test_sizes_many_trades_with_one_conversion_request(catalog):
+    get = MockGet()
+    rates = ConversionRates(get, ACCOUNT_ID)
+    trades = [("EUR_USD", 1.0850, 1.0820), ("USD_JPY", 150.10, 150.60), ("GBP_USD", 1.2700, 1.2750)]
+    sizes = calculate_position_sizes(100000, 1, trades, rates, catalog.pip_location, catalog.unit_precision)
+    assert get.calls == 2  # The account summary, then one pricing request for every currency
+
+    conversion = rates.rates(["EUR_USD", "USD_JPY"])
+    usd, jpy = conversion["EUR_USD"], conversion["USD_JPY"]
+    assert get.calls == 2  # Answered from the cache
+    assert [size.units for size in sizes] == [int(1000 / (0.003 * usd)), int(1000 / (0.5 * jpy)),
+                                             int(1000 / (0.005 * usd))]
+    assert [round(size.stop_pips, 6) for size in sizes] == [30, 50, 50]
+    for size in sizes:
+        # Rounding down keeps the loss at the stop within the risk amount
+        assert size.stop_pips * size.pip_value <= size.risk_amount == 1000
+
+
+def test_cfd_units_keep_the_instruments_precision(catalog):
+    rates = ConversionRates(MockGet(), ACCOUNT_ID)
+    assert catalog.unit_precision("DE30_EUR") == 1
+    size = calculate_position_sizes(5000, 1, [("DE30_EUR", 18000, 17900)], rates, catalog.pip_location,
+                                    catalog.unit_precision)[0]
+    eur = rates.rates(["DE30_EUR"])["DE30_EUR"]
+    assert size.units == int(50 / (100 * eur) * 10) / 10
+    assert 0 < size.units < 1
+
+    # Without the precision the same trade rounds down to nothing
+    whole = calculate_position_sizes(5000, 1, [("DE30_EUR", 18000, 17900)], rates, catalog.pip_location)[0]
+    assert whole.units == 0
+
+
+def test_entry_equal_to_stop_is_rejected(catalog):
+    with pytest.raises(ValueError, match="EUR_USD"):
+        calculate_position_sizes(100000, 1, [("EUR_USD", 1.0850, 1.0850)], ConversionRates(MockGet(), ACCOUNT_ID),
+                                 catalog.pip_location, catalog.unit_precision)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from daytrading.stop_loss import (DEFAULT_PERCENTAGES, calculate_atr_stop_matrix, calculate_stop_loss_matrix,
+                                  calculate_stop_losses)
+
+
+# The loop the calculator used before it was vectorized
+def looped_stop_losses(swing_price, direction, percentages=DEFAULT_PERCENTAGES):
+    multiplier = -1 if direction == "LONG" else 1
+    return [swing_price + (multiplier * swing_price * (percentage / 100)) for percentage in percentages]
+
+
+def test_matrix_matches_the_per_price_loop():
+    swings = np.linspace(0.5, 40000, 257)
+    directions = np.where(np.arange(len(swings)) % 3 == 0, "SHORT", "LONG")
+    percentages = [0.03, 0.1, 0.3, 1, 3]
+    matrix = calculate_stop_loss_matrix(swings, directions, percentages)
+    assert matrix.shape == (len(swings), len(percentages))
+    expected = [looped_stop_losses(swing, direction, percentages) for swing, direction in zip(swings, directions)]
+    np.testing.assert_allclose(matrix, expected, rtol=1e-12)
+
+
+def test_single_direction_applies_to_every_row():
+    matrix = calculate_stop_loss_matrix([1.0850, 150.10], "SHORT")
+    assert (matrix > np.array([[1.0850], [150.10]])).all()
+    assert calculate_stop_losses(1.0850, "LONG") == pytest.approx(
+        dict(zip(["0.03%", "0.3%", "3%"], looped_stop_losses(1.0850, "LONG"))))
+
+
+def test_atr_stops_move_multiples_of_each_rows_atr():
+    matrix = calculate_atr_stop_matrix([1.0850, 1.0900], ["LONG", "SHORT"], [0.0020, 0.0010], [1, 2])
+    np.testing.assert_allclose(matrix, [[1.0830, 1.0810], [1.0910, 1.0920]])
+
+
+def test_unknown_direction_is_rejected():
+    with pytest.raises(ValueError, match="BUY"):
+        calculate_stop_loss_matrix([1.0, 2.0], ["LONG", "BUY"])